@@ -0,0 +1,62 @@
+"""Benchmarks of AnatomicalCoordinatesImage write, read, and coordinate lookups."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .generators import BACKENDS, get_io_class, make_coordinates_image, open_nwbfile, write_nwbfile
+
+SIZES = [512, 2048, 4096]
+
+
+class TimeImageWriteRead:
+    params = [SIZES, BACKENDS]
+    param_names = ["size", "backend"]
+    timeout = 300
+    # Run the setup before every sample, so each write creates a new file
+    number = 1
+
+    def setup(self, size, backend):
+        get_io_class(backend)
+        self.directory = Path(tempfile.mkdtemp())
+        self.nwbfile = make_coordinates_image(size, backend)
+        write_nwbfile(make_coordinates_image(size, backend), self.directory / "read.nwb", backend)
+        self.io = open_nwbfile(self.directory / "read.nwb", backend)
+        localization = self.io.read().lab_meta_data["localization"]
+        self.coords = localization.anatomical_coordinates_images["FieldOfViewCoordinates"]
+        rng = np.random.default_rng(0)
+        self.pixel_rows, self.pixel_cols = rng.integers(size, size=(2, 10_000))
+        self.sparse_pixel_rows, self.sparse_pixel_cols = rng.integers(size, size=(2, 200))
+        self.dense_pixel_rows, self.dense_pixel_cols = rng.integers(size, size=(2, 50_000))
+        # Pixels clustered in a 256 x 256 window, e.g. the footprints of the cells of one field
+        self.local_pixel_rows, self.local_pixel_cols = rng.integers(256, size=(2, 10_000)) + (size - 256) // 2
+
+    def teardown(self, size, backend):
+        self.io.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_write(self, size, backend):
+        write_nwbfile(self.nwbfile, self.directory / "written.nwb", backend)
+
+    def time_get_coordinates(self, size, backend):
+        self.coords.get_coordinates()
+
+    def time_get_coordinates_window(self, size, backend):
+        self.coords.get_coordinates(rows=slice(size // 2, size // 2 + 256), cols=slice(size // 2, size // 2 + 256))
+
+    def time_get_coordinates_pixels(self, size, backend):
+        self.coords.get_coordinates(i=self.pixel_rows, j=self.pixel_cols)
+
+    def time_get_coordinates_sparse_pixels(self, size, backend):
+        self.coords.get_coordinates(i=self.sparse_pixel_rows, j=self.sparse_pixel_cols)
+
+    def time_get_coordinates_dense_pixels(self, size, backend):
+        self.coords.get_coordinates(i=self.dense_pixel_rows, j=self.dense_pixel_cols)
+
+    def time_get_coordinates_local_pixels(self, size, backend):
+        self.coords.get_coordinates(i=self.local_pixel_rows, j=self.local_pixel_cols)
+
+    def peakmem_get_coordinates(self, size, backend):
+        self.coords.get_coordinates()
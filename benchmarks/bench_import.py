@@ -0,0 +1,13 @@
+"""Benchmarks of the package import time.
+
+Each benchmark runs in a fresh interpreter, so the namespace is loaded from scratch every time.
+"""
+
+
+class TimeImport:
+    def timeraw_import_pynwb(self):
+        return "import pynwb"
+
+    def timeraw_import_package(self):
+        # pynwb is imported in the setup so only the extension itself is timed
+        return "import ndx_anatomical_localization", "import pynwb"
@@ -0,0 +1,22 @@
+"""Benchmarks of BrainRegionMasks rasterization at full field-of-view density."""
+
+from .generators import make_region_masks
+
+SIZES = [512, 2048]
+
+
+class TimeMasksToImage:
+    params = [SIZES, ["pixel", "rle"]]
+    param_names = ["size", "encoding"]
+    timeout = 300
+
+    def setup(self, size, encoding):
+        self.masks = make_region_masks(size, encoding)
+
+    def time_to_image(self, size, encoding):
+        # Adding no rows keeps the cache key, so clear the cache to time the rasterization itself
+        self.masks._image_cache = None
+        self.masks._to_image(size, size)
+
+    def time_from_label_image(self, size, encoding):
+        make_region_masks(size, encoding)
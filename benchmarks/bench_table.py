@@ -0,0 +1,49 @@
+"""Benchmarks of AnatomicalCoordinatesTable construction, write, and read."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from .generators import BACKENDS, get_io_class, make_coordinates_table, open_nwbfile, write_nwbfile
+
+N_ROWS = [1_000, 100_000, 1_000_000]
+
+
+class TimeTableConstruction:
+    params = [N_ROWS]
+    param_names = ["n_rows"]
+    timeout = 300
+
+    def time_from_arrays(self, n_rows):
+        make_coordinates_table(n_rows)
+
+
+class TimeTableWriteRead:
+    params = [N_ROWS, BACKENDS]
+    param_names = ["n_rows", "backend"]
+    timeout = 300
+    # Run the setup before every sample, so each write creates a new file
+    number = 1
+
+    def setup(self, n_rows, backend):
+        get_io_class(backend)
+        self.directory = Path(tempfile.mkdtemp())
+        self.path = self.directory / "written.nwb"
+        self.nwbfile = make_coordinates_table(n_rows)
+        write_nwbfile(make_coordinates_table(n_rows), self.directory / "read.nwb", backend)
+
+    def teardown(self, n_rows, backend):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_write(self, n_rows, backend):
+        write_nwbfile(self.nwbfile, self.path, backend)
+
+    def time_read_coordinates(self, n_rows, backend):
+        with open_nwbfile(self.directory / "read.nwb", backend) as io:
+            table = io.read().lab_meta_data["localization"].anatomical_coordinates_tables["MyAnatomicalLocalization"]
+            table.to_space(table.space)
+
+    def time_read_joined_dataframe(self, n_rows, backend):
+        with open_nwbfile(self.directory / "read.nwb", backend) as io:
+            table = io.read().lab_meta_data["localization"].anatomical_coordinates_tables["MyAnatomicalLocalization"]
+            table.to_joined_dataframe()
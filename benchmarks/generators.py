@@ -0,0 +1,142 @@
+"""Synthetic data for the benchmarks."""
+
+import os
+
+import numpy as np
+from hdmf.common import DynamicTable
+from pynwb.base import Images
+from pynwb.image import GrayscaleImage
+from pynwb.testing.mock.file import mock_NWBFile
+
+from ndx_anatomical_localization import (
+    AllenCCFv3Space,
+    AnatomicalCoordinatesImage,
+    AnatomicalCoordinatesTable,
+    BrainRegionMasks,
+    Localization,
+)
+from pynwb import NWBHDF5IO
+
+BACKENDS = ["hdf5", "zarr"]
+
+
+def get_io_class(backend: str):
+    """Get the NWB IO class of a backend, raising NotImplementedError (skipped by asv) if it is not installed."""
+    if backend == "hdf5":
+        return NWBHDF5IO
+    try:
+        from hdmf_zarr.nwb import NWBZarrIO
+    except ImportError as e:
+        raise NotImplementedError("hdmf-zarr is not installed") from e
+    return NWBZarrIO
+
+
+def make_localization_nwbfile():
+    """Create an NWB file with an empty Localization and an AllenCCFv3Space."""
+    nwbfile = mock_NWBFile()
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    space = AllenCCFv3Space()
+    localization.add_spaces([space])
+    return nwbfile, localization, space
+
+
+def make_coordinates_arrays(n_rows: int, seed: int = 0) -> dict:
+    """Get random CCF coordinates and brain regions for ``n_rows`` localized entities."""
+    rng = np.random.default_rng(seed)
+    coords = rng.uniform(0, [13200.0, 8000.0, 11400.0], size=(n_rows, 3))
+    regions = np.array(["VISp", "VISl", "CA1", "CA3", "DG", "LGd", "LP", "MOp"])
+    return {
+        "x": coords[:, 0],
+        "y": coords[:, 1],
+        "z": coords[:, 2],
+        "localized_entity": np.arange(n_rows),
+        "brain_region": regions[rng.integers(len(regions), size=n_rows)],
+    }
+
+
+def make_coordinates_table(n_rows: int, seed: int = 0):
+    """Create an NWB file with an AnatomicalCoordinatesTable of ``n_rows`` rows.
+
+    The localized entities are the rows of a table with only ids, so building the target does not dominate.
+    """
+    nwbfile, localization, space = make_localization_nwbfile()
+    target = DynamicTable(name="probe_sites", description="probe sites", id=np.arange(n_rows))
+    nwbfile.create_processing_module("ecephys", "ecephys").add(target)
+    table = AnatomicalCoordinatesTable.from_arrays(
+        name="MyAnatomicalLocalization",
+        description="Anatomical coordinates table",
+        space=space,
+        method="synthetic",
+        target=target,
+        **make_coordinates_arrays(n_rows, seed),
+    )
+    localization.add_anatomical_coordinates_tables([table])
+    return nwbfile
+
+
+def make_coordinate_planes(size: int) -> dict:
+    """Get smooth x, y, z coordinate planes of a ``size`` x ``size`` field of view, as from an affine registration."""
+    rows, cols = np.mgrid[0:size, 0:size].astype(np.float32)
+    return {
+        "x": 5000.0 + 1.2 * cols - 0.3 * rows,
+        "y": 3000.0 + 0.3 * cols + 1.2 * rows,
+        "z": np.full((size, size), 6000.0, dtype=np.float32) + 0.01 * rows,
+    }
+
+
+def make_coordinates_image(size: int, backend: str = "hdf5"):
+    """Create an NWB file with an AnatomicalCoordinatesImage of a ``size`` x ``size`` field of view.
+
+    The coordinate planes are stored in gzip-compressed tiles of 256 x 256 pixels on the HDF5 backend, or in
+    ``ZarrDataIO`` chunks of the same shape on the Zarr backend.
+    """
+    planes = make_coordinate_planes(size)
+    storage = None
+    if backend == "zarr":
+        from hdmf_zarr import ZarrDataIO
+
+        chunks = (min(size, 256), min(size, 256))
+        planes = {key: ZarrDataIO(plane, chunks=chunks) for key, plane in planes.items()}
+    else:
+        storage = {"compression": "gzip", "compression_opts": 4, "shuffle": True}
+    nwbfile, localization, space = make_localization_nwbfile()
+    image = GrayscaleImage(name="MeanImage", data=np.zeros((size, size), dtype=np.uint16), description="mean image")
+    nwbfile.create_processing_module("ophys", "ophys").add(
+        Images(name="SummaryImages", description="summary", images=[image])
+    )
+    coords = AnatomicalCoordinatesImage(
+        name="FieldOfViewCoordinates",
+        image=image,
+        method="synthetic",
+        space=space,
+        storage=storage,
+        **planes,
+    )
+    localization.add_anatomical_coordinates_images([coords])
+    return nwbfile
+
+
+def make_label_image(size: int, n_regions: int = 16, seed: int = 0) -> np.ndarray:
+    """Get a ``size`` x ``size`` label image covered by ``n_regions`` vertical bands with jittered borders."""
+    rng = np.random.default_rng(seed)
+    cols = np.arange(size)[None, :] + rng.integers(-8, 9, size=(size, 1))
+    return (np.clip(cols, 0, size - 1) * n_regions // size + 1).astype(np.int32)
+
+
+def make_region_masks(size: int, encoding: str = "pixel"):
+    """Create a BrainRegionMasks in which every pixel of a ``size`` x ``size`` field of view has a region."""
+    return BrainRegionMasks.from_label_image(
+        name="masks", description="synthetic masks", label_image=make_label_image(size), encoding=encoding
+    )
+
+
+def write_nwbfile(nwbfile, path, backend: str):
+    """Write an NWB file with the IO class of ``backend``."""
+    with get_io_class(backend)(os.fspath(path), "w") as io:
+        io.write(nwbfile)
+
+
+def open_nwbfile(path, backend: str):
+    """Open an NWB file for reading with the IO class of ``backend``. The caller closes the returned IO."""
+    return get_io_class(backend)(os.fspath(path), "r")
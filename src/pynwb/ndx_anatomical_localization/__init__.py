@@ -1,6 +1,8 @@
 import os
 
-from pynwb import get_class, load_namespaces, register_class
+from pynwb import get_class, register_class
+
+from ._spec_cache import load_namespaces
 
 try:
     from importlib.resources import files
@@ -16,9 +18,11 @@ __spec_path = __location_of_this_file / "spec" / "ndx-anatomical-localization.na
 if not os.path.exists(__spec_path):
     __spec_path = __location_of_this_file.parent.parent.parent / "spec" / "ndx-anatomical-localization.namespace.yaml"
 
-# Load the namespace
+# Load the namespace, reading the parsed spec from the cache when it is up to date
 load_namespaces(str(__spec_path))
 
+from .atlas_volumes import get_atlas_directory, get_atlas_volume, set_atlas_directory
+from .catalog import build_catalog, read_catalog, read_localization_summary
 from .ndx_anatomical_localization import (
     AffineTransformation,
     AllenCCFv3Space,
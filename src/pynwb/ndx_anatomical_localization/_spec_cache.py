@@ -0,0 +1,71 @@
+"""Load the extension namespace from a JSON cache of the parsed YAML spec files.
+
+Parsing the YAML spec is the largest part of the cost of importing this package. The first import writes the parsed
+content of each spec file as JSON to a cache directory, keyed by the SHA-256 hash of the file, and later imports read
+the JSON instead. Editing a spec file changes its hash, so stale entries are never used.
+
+The cache directory is ``$NDX_ANATOMICAL_LOCALIZATION_CACHE_DIR``, or else ``ndx-anatomical-localization`` in
+``$XDG_CACHE_HOME`` (``~/.cache`` by default). If it cannot be written, the YAML files are parsed on every import.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from hdmf.spec.namespace import YAMLSpecReader
+
+from pynwb import get_type_map
+
+CACHE_DIRECTORY_ENV_VAR = "NDX_ANATOMICAL_LOCALIZATION_CACHE_DIR"
+
+
+def get_cache_directory() -> Path:
+    """Get the directory of the cached parsed spec files."""
+    if CACHE_DIRECTORY_ENV_VAR in os.environ:
+        return Path(os.environ[CACHE_DIRECTORY_ENV_VAR])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "ndx-anatomical-localization"
+
+
+class CachedYAMLSpecReader(YAMLSpecReader):
+    """A ``YAMLSpecReader`` that caches the parsed content of each spec file as JSON."""
+
+    def __init__(self, indir: str, cache_directory: Path):
+        super().__init__(indir=indir)
+        self.cache_directory = cache_directory
+
+    def _read_cached(self, path: str, parse, *args):
+        with open(path, "rb") as stream:
+            digest = hashlib.sha256(stream.read()).hexdigest()
+        cache_path = self.cache_directory / f"{digest}.json"
+        try:
+            with open(cache_path) as stream:
+                return json.load(stream)
+        except (OSError, ValueError):
+            pass
+
+        content = parse(*args)
+        try:
+            self.cache_directory.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so concurrent imports never read a partial entry
+            with tempfile.NamedTemporaryFile("w", dir=self.cache_directory, suffix=".tmp", delete=False) as stream:
+                json.dump(content, stream)
+            os.replace(stream.name, cache_path)
+        except OSError:
+            pass
+        return content
+
+    def read_namespace(self, namespace_path):
+        return self._read_cached(namespace_path, super().read_namespace, namespace_path)
+
+    def read_spec(self, spec_path):
+        path = spec_path if os.path.isabs(spec_path) else os.path.join(self.source, spec_path)
+        return self._read_cached(path, super().read_spec, spec_path)
+
+
+def load_namespaces(namespace_path: str):
+    """Load the namespaces in the given file into the pynwb type map, like ``pynwb.load_namespaces``."""
+    reader = CachedYAMLSpecReader(indir=os.path.dirname(namespace_path), cache_directory=get_cache_directory())
+    return get_type_map(copy=False).load_namespaces(namespace_path=namespace_path, reader=reader)
@@ -0,0 +1,126 @@
+"""Registry of local, memory-mapped atlas volumes for the canonical spaces.
+
+Volumes are never downloaded. They are read from a user-configured directory laid out as::
+
+    <atlas_directory>/<space_name>/<kind>_<resolution>.npy
+
+for example ``AllenCCFv3/annotation_10.npy`` for the 10 um CCFv3 annotation volume. The directory is set with
+:py:func:`set_atlas_directory` or the ``NDX_ANATOMICAL_LOCALIZATION_ATLAS_DIR`` environment variable.
+
+Volumes are opened read-only with ``np.load(..., mmap_mode="r")``, so the operating system shares their pages
+between all processes that open the same file, and only the most recently used volumes are kept open.
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from .ndx_anatomical_localization import (
+    AllenCCFv3Space,
+    D99v2Space,
+    MEBRAINSSpace,
+    NMTv2AsymmetricSpace,
+    NMTv2Space,
+    Space,
+)
+
+ATLAS_DIRECTORY_ENV_VAR = "NDX_ANATOMICAL_LOCALIZATION_ATLAS_DIR"
+
+# Maximum number of (space, kind, resolution) volumes kept open at once
+MAX_OPEN_VOLUMES = 4
+
+CANONICAL_SPACE_NAMES = {
+    AllenCCFv3Space: "AllenCCFv3",
+    D99v2Space: "D99v2",
+    NMTv2Space: "NMTv2",
+    NMTv2AsymmetricSpace: "NMTv2Asymmetric",
+    MEBRAINSSpace: "MEBRAINS",
+}
+
+_atlas_directory = None
+
+
+def set_atlas_directory(path):
+    """Set the local directory that atlas volumes are read from.
+
+    Parameters
+    ----------
+    path : str or Path or None
+        The atlas directory. If None, the ``NDX_ANATOMICAL_LOCALIZATION_ATLAS_DIR`` environment variable is used.
+    """
+    global _atlas_directory
+    _atlas_directory = None if path is None else Path(path)
+    _load_volume.cache_clear()
+
+
+def get_atlas_directory() -> Path:
+    """Get the local directory that atlas volumes are read from.
+
+    Returns
+    -------
+    Path
+        The directory set with :py:func:`set_atlas_directory`, or else the ``NDX_ANATOMICAL_LOCALIZATION_ATLAS_DIR``
+        environment variable.
+    """
+    if _atlas_directory is not None:
+        return _atlas_directory
+    if ATLAS_DIRECTORY_ENV_VAR not in os.environ:
+        raise ValueError(
+            "No atlas directory is configured. Call set_atlas_directory(path) or set the "
+            f"{ATLAS_DIRECTORY_ENV_VAR} environment variable."
+        )
+    return Path(os.environ[ATLAS_DIRECTORY_ENV_VAR])
+
+
+def get_atlas_volume_path(space, resolution: float, kind: str = "annotation") -> Path:
+    """Get the path of the atlas volume of a canonical space.
+
+    Parameters
+    ----------
+    space : Space or type
+        A canonical space (e.g. ``AllenCCFv3Space()``) or canonical space class (e.g. ``AllenCCFv3Space``).
+    resolution : float
+        Voxel size of the volume, in the units of the space (e.g. 10 for the 10 um CCFv3 volumes).
+    kind : str, optional
+        The kind of volume, e.g. "annotation" or "template". Defaults to "annotation".
+
+    Returns
+    -------
+    Path
+    """
+    space_class = space if isinstance(space, type) else type(space)
+    if space_class not in CANONICAL_SPACE_NAMES:
+        name = space_class.__name__ if issubclass(space_class, Space) else repr(space)
+        raise ValueError(f"{name} is not a canonical space. Supported: {[c.__name__ for c in CANONICAL_SPACE_NAMES]}")
+    return get_atlas_directory() / CANONICAL_SPACE_NAMES[space_class] / f"{kind}_{resolution:g}.npy"
+
+
+@lru_cache(maxsize=MAX_OPEN_VOLUMES)
+def _load_volume(path: Path) -> np.ndarray:
+    return np.load(path, mmap_mode="r")
+
+
+def get_atlas_volume(space, resolution: float, kind: str = "annotation") -> np.ndarray:
+    """Get the memory-mapped atlas volume of a canonical space.
+
+    Parameters
+    ----------
+    space : Space or type
+        A canonical space (e.g. ``AllenCCFv3Space()``) or canonical space class (e.g. ``AllenCCFv3Space``).
+    resolution : float
+        Voxel size of the volume, in the units of the space (e.g. 10 for the 10 um CCFv3 volumes).
+    kind : str, optional
+        The kind of volume, e.g. "annotation" or "template". Defaults to "annotation".
+
+    Returns
+    -------
+    np.memmap
+        Read-only volume whose axes follow the x, y, and z axes of the space. Repeated calls return the same
+        object while it is among the most recently used volumes.
+    """
+    path = get_atlas_volume_path(space, resolution, kind)
+    if not path.exists():
+        raise FileNotFoundError(f"Atlas volume not found: {path}")
+    return _load_volume(path)
@@ -0,0 +1,371 @@
+"""Cross-session catalog of the anatomical coordinates stored in many NWB files.
+
+:py:func:`build_catalog` reads the ``Localization`` groups of each file directly with h5py, without building the
+pynwb object graph, converts every coordinate into one target space, and writes a single columnar catalog:
+
+- ``.npz`` files are written with NumPy.
+- ``.parquet`` files are written with ``pyarrow``, which must be installed.
+
+Rows are sorted by brain region and source space, and the catalog stores the start and stop row of every
+(brain region, source space) pair, so :py:func:`read_catalog` only reads the rows of the selected pairs: the
+uncompressed columns of ``.npz`` catalogs are memory-mapped and sliced, and ``.parquet`` catalogs store each pair in
+its own row group.
+
+:py:func:`read_localization_summary` lists the contents of the ``Localization`` group of a file the same way.
+"""
+
+import json
+import os
+import posixpath
+import struct
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import h5py
+import numpy as np
+
+from .ndx_anatomical_localization import _space_transform_matrix
+
+# Columns of the catalog, in order, and their dtypes while the catalog is built
+_COLUMN_DTYPES = {
+    "path": object,
+    "table": object,
+    "target": object,
+    "row": np.int64,
+    "localized_entity": np.int64,
+    "x": np.float64,
+    "y": np.float64,
+    "z": np.float64,
+    "brain_region": object,
+    "source_space": object,
+}
+CATALOG_COLUMNS = tuple(_COLUMN_DTYPES)
+
+
+def _iter_localization_groups(nwb_file: h5py.File):
+    """Yield the ``Localization`` groups stored as lab metadata of an open NWB file."""
+    general = nwb_file.get("general")
+    if general is None:
+        return
+    for group in general.values():
+        if isinstance(group, h5py.Group) and group.attrs.get("neurodata_type") == "Localization":
+            yield group
+
+
+def _iter_typed_children(group: h5py.Group, neurodata_type: str):
+    for child in group.values():
+        if isinstance(child, h5py.Group) and child.attrs.get("neurodata_type") == neurodata_type:
+            yield child
+
+
+def _is_space_group(group) -> bool:
+    return isinstance(group, h5py.Group) and "space_name" in group.attrs and "orientation" in group.attrs
+
+
+def _link_name(group: h5py.Group, link: str) -> str | None:
+    """Get the name of the object that a link of ``group`` points to, or None if the link is missing."""
+    target = group.get(link, getlink=True)
+    if target is None:
+        return None
+    return posixpath.basename(target.path if isinstance(target, h5py.SoftLink) else group[link].name)
+
+
+def read_localization_summary(path) -> dict:
+    """List the contents of the ``Localization`` lab metadata of an NWB file.
+
+    The HDF5 file is inspected directly with h5py: only attributes and dataset shapes are read, and no pynwb
+    object is constructed, which makes scanning many files much faster than reading them with ``NWBHDF5IO``.
+
+    Parameters
+    ----------
+    path : str or Path
+        The NWB (HDF5) file.
+
+    Returns
+    -------
+    dict
+        With keys "spaces", "anatomical_coordinates_tables", "anatomical_coordinates_images", and
+        "brain_region_masks", each a list with one dict per object. Every dict has the ``name`` and
+        ``neurodata_type`` of the object, plus:
+
+        - spaces: ``space_name``, ``origin``, ``units``, and ``orientation``
+        - anatomical_coordinates_tables: ``description``, ``method``, ``space``, ``target`` (path of the table
+          of the localized entities), and ``n_rows``
+        - anatomical_coordinates_images: ``description``, ``method``, ``space``, ``image``, and ``shape``
+          (height, width) of the coordinate planes
+        - brain_region_masks: ``description`` and ``n_rows``
+
+        ``space`` and ``image`` are the names of the linked objects. The lists are empty if the file has no
+        ``Localization``.
+    """
+    summary = {
+        "spaces": [],
+        "anatomical_coordinates_tables": [],
+        "anatomical_coordinates_images": [],
+        "brain_region_masks": [],
+    }
+    with h5py.File(path, "r") as nwb_file:
+        for localization in _iter_localization_groups(nwb_file):
+            for name, group in localization.items():
+                if not isinstance(group, h5py.Group):
+                    continue
+                attrs = group.attrs
+                info = {"name": name, "neurodata_type": attrs.get("neurodata_type")}
+                if _is_space_group(group):
+                    for key in ("space_name", "origin", "units", "orientation"):
+                        info[key] = attrs[key]
+                    summary["spaces"].append(info)
+                elif info["neurodata_type"] == "AnatomicalCoordinatesTable":
+                    info.update(
+                        description=attrs.get("description"),
+                        method=attrs.get("method"),
+                        space=_link_name(group, "space"),
+                        target=nwb_file[group["localized_entity"].attrs["table"]].name,
+                        n_rows=len(group["id"]),
+                    )
+                    summary["anatomical_coordinates_tables"].append(info)
+                elif info["neurodata_type"] == "AnatomicalCoordinatesImage":
+                    image = group.get("image")
+                    plane = group["x"] if "x" in group else image
+                    info.update(
+                        description=attrs.get("description"),
+                        method=attrs.get("method"),
+                        space=_link_name(group, "space"),
+                        image=_link_name(group, "image"),
+                        shape=None if plane is None else tuple(plane.shape[:2]),
+                    )
+                    summary["anatomical_coordinates_images"].append(info)
+                elif info["neurodata_type"] == "BrainRegionMasks":
+                    info.update(description=attrs.get("description"), n_rows=len(group["id"]))
+                    summary["brain_region_masks"].append(info)
+    return summary
+
+
+def _read_strings(dataset, n_rows: int) -> np.ndarray:
+    if dataset is None:
+        return np.full(n_rows, "", dtype=str)
+    return np.asarray(dataset.asstr()[:], dtype=str)
+
+
+def _read_file_coordinates(path, target_orientation: str, target_units: str) -> dict:
+    """Read the rows of every ``AnatomicalCoordinatesTable`` of a file, converted into the target space."""
+    parts = []
+    with h5py.File(path, "r") as nwb_file:
+        for localization in _iter_localization_groups(nwb_file):
+            for table in _iter_typed_children(localization, "AnatomicalCoordinatesTable"):
+                space = table["space"]
+                matrix = _space_transform_matrix(
+                    space.attrs["orientation"], space.attrs["units"], target_orientation, target_units
+                )
+                coords = np.column_stack([table["x"][:], table["y"][:], table["z"][:]]).astype(np.float64)
+                coords = coords @ matrix[:3, :3].T + matrix[:3, 3]
+                n_rows = len(coords)
+                localized_entity = table["localized_entity"]
+                parts.append(
+                    {
+                        "path": np.full(n_rows, str(path), dtype=object),
+                        "table": np.full(n_rows, table.name, dtype=object),
+                        "target": np.full(n_rows, nwb_file[localized_entity.attrs["table"]].name, dtype=object),
+                        "row": np.arange(n_rows, dtype=np.int64),
+                        "localized_entity": localized_entity[:].astype(np.int64),
+                        "x": coords[:, 0],
+                        "y": coords[:, 1],
+                        "z": coords[:, 2],
+                        "brain_region": _read_strings(table.get("brain_region"), n_rows).astype(object),
+                        "source_space": np.full(n_rows, space.attrs["space_name"], dtype=object),
+                    }
+                )
+    return _concatenate(parts)
+
+
+def _concatenate(parts) -> dict:
+    if not parts:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in _COLUMN_DTYPES.items()}
+    return {name: np.concatenate([part[name] for part in parts]) for name in CATALOG_COLUMNS}
+
+
+def _build_index(brain_region: np.ndarray, source_space: np.ndarray) -> dict:
+    """Get the start and stop rows of each (brain region, source space) pair of a sorted catalog."""
+    if not len(brain_region):
+        empty = np.empty(0, dtype=np.int64)
+        return {
+            "brain_region": np.empty(0, dtype=str),
+            "source_space": np.empty(0, dtype=str),
+            "start": empty,
+            "stop": empty,
+        }
+    changes = (brain_region[1:] != brain_region[:-1]) | (source_space[1:] != source_space[:-1])
+    start = np.concatenate([[0], np.flatnonzero(changes) + 1])
+    stop = np.append(start[1:], len(brain_region))
+    return {
+        "brain_region": brain_region[start],
+        "source_space": source_space[start],
+        "start": start.astype(np.int64),
+        "stop": stop.astype(np.int64),
+    }
+
+
+def build_catalog(paths, space, output_path, workers: int | None = None) -> dict:
+    """Build a catalog of the anatomical coordinates stored in many NWB files.
+
+    Each file is opened in a worker process, which reads only the ``AnatomicalCoordinatesTable`` groups of its
+    ``Localization`` lab metadata and converts their coordinates into ``space``.
+
+    Parameters
+    ----------
+    paths : iterable of str or Path
+        The NWB (HDF5) files to read.
+    space : Space or type
+        The space the coordinates are converted into, e.g. ``AllenCCFv3Space()``. As in
+        :py:meth:`Space.transform_to`, spaces are assumed to share the same origin.
+    output_path : str or Path
+        The catalog file to write, ending in ``.npz`` or ``.parquet``.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs. With 1, the files are read in this process.
+
+    Returns
+    -------
+    dict
+        The catalog columns (see ``CATALOG_COLUMNS``), sorted by brain region and source space.
+    """
+    output_path = os.fspath(output_path)
+    if not output_path.endswith((".npz", ".parquet")):
+        raise ValueError(f"output_path must end in '.npz' or '.parquet'. Provided: {output_path}")
+    if isinstance(space, type):
+        space = space()
+    paths = [os.fspath(path) for path in paths]
+    # Fail before opening any file if the target units cannot be converted
+    _space_transform_matrix(space.orientation, space.units, space.orientation, space.units)
+    read_file = partial(_read_file_coordinates, target_orientation=space.orientation, target_units=space.units)
+
+    if workers == 1:
+        parts = [read_file(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(read_file, paths))
+    catalog = _concatenate([part for part in parts if len(part["row"])])
+
+    order = np.lexsort((catalog["source_space"].astype(str), catalog["brain_region"].astype(str)))
+    catalog = {name: values[order] for name, values in catalog.items()}
+    for name, dtype in _COLUMN_DTYPES.items():
+        if dtype is object:
+            catalog[name] = catalog[name].astype(str)
+    index = _build_index(catalog["brain_region"], catalog["source_space"])
+
+    if output_path.endswith(".npz"):
+        np.savez(
+            output_path,
+            space=np.asarray(space.space_name),
+            **catalog,
+            **{f"index_{name}": values for name, values in index.items()},
+        )
+    else:
+        _write_parquet(output_path, catalog, index, space.space_name)
+    return catalog
+
+
+def _write_parquet(output_path: str, catalog: dict, index: dict, space_name: str):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required to write Parquet catalogs. Install it with `pip install pyarrow`."
+        ) from e
+
+    metadata = {
+        "space": space_name,
+        "index": json.dumps({name: values.tolist() for name, values in index.items()}),
+    }
+    table = pa.table({name: catalog[name] for name in CATALOG_COLUMNS}).replace_schema_metadata(metadata)
+    # One row group per (brain region, source space) pair, so each pair can be read on its own
+    with pq.ParquetWriter(output_path, table.schema) as writer:
+        for start, stop in zip(index["start"], index["stop"]):
+            writer.write_table(table.slice(start, stop - start))
+
+
+def _open_npz_column(path: str, npz: zipfile.ZipFile, name: str) -> np.ndarray:
+    """Memory-map an array stored uncompressed in an ``.npz`` file, or load it if it is compressed."""
+    info = npz.getinfo(f"{name}.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        with npz.open(info) as stream:
+            return np.lib.format.read_array(stream)
+    with open(path, "rb") as stream:
+        # The member data follows its 30-byte local file header, file name, and extra field
+        stream.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack("<HH", stream.read(4))
+        stream.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+        offset = stream.tell()
+    if not np.prod(shape):
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape, order="F" if fortran_order else "C")
+
+
+def read_catalog(path, brain_region: str | None = None, source_space: str | None = None) -> dict:
+    """Read the rows of a catalog written by :py:func:`build_catalog`.
+
+    Parameters
+    ----------
+    path : str or Path
+        The ``.npz`` or ``.parquet`` catalog file.
+    brain_region : str, optional
+        Only read the rows in this brain region.
+    source_space : str, optional
+        Only read the rows whose coordinates were stored in this space, by ``space_name`` (e.g. "AllenCCFv3").
+
+    Returns
+    -------
+    dict
+        The catalog columns (see ``CATALOG_COLUMNS``) of the selected rows, plus the ``space`` the coordinates are
+        expressed in.
+    """
+    path = os.fspath(path)
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "pyarrow is required to read Parquet catalogs. Install it with `pip install pyarrow`."
+            ) from e
+        parquet_file = pq.ParquetFile(path)
+        metadata = parquet_file.schema_arrow.metadata
+        space_name = metadata[b"space"].decode()
+        index = {name: np.asarray(values) for name, values in json.loads(metadata[b"index"]).items()}
+        selected = _select_index(index, brain_region, source_space)
+        # Row group i holds the rows of index entry i
+        table = parquet_file.read_row_groups(np.flatnonzero(selected).tolist(), columns=list(CATALOG_COLUMNS))
+        catalog = {name: table[name].to_numpy() for name in CATALOG_COLUMNS}
+    else:
+        with zipfile.ZipFile(path) as npz:
+            with npz.open("space.npy") as stream:
+                space_name = str(np.lib.format.read_array(stream))
+            index = {
+                name: np.array(_open_npz_column(path, npz, f"index_{name}"))
+                for name in ("brain_region", "source_space", "start", "stop")
+            }
+            selected = _select_index(index, brain_region, source_space)
+            catalog = {}
+            for name in CATALOG_COLUMNS:
+                values = _open_npz_column(path, npz, name)
+                catalog[name] = np.concatenate(
+                    [values[start:stop] for start, stop in zip(index["start"][selected], index["stop"][selected])]
+                    + [values[:0]]
+                )
+    catalog["space"] = space_name
+    return catalog
+
+
+def _select_index(index: dict, brain_region: str | None, source_space: str | None) -> np.ndarray:
+    """Get a boolean mask of the index entries of the given brain region and source space."""
+    selected = np.ones(len(index["start"]), dtype=bool)
+    if brain_region is not None:
+        selected &= index["brain_region"] == brain_region
+    if source_space is not None:
+        selected &= index["source_space"] == source_space
+    return selected
@@ -1,13 +1,83 @@
+import itertools
+import os
+from functools import cache
+
 import numpy as np
-from hdmf.common import DynamicTable
-from hdmf.utils import AllowPositional, get_docval
+import pandas as pd
+from hdmf.common import DynamicTable, DynamicTableRegion, VectorData, VectorIndex
+from hdmf.container import AbstractContainer
+from hdmf.data_utils import AbstractDataChunkIterator, DataIO, GenericDataChunkIterator
+from hdmf.utils import AllowPositional, get_data_shape, get_docval
 from pynwb.image import Image
 from pynwb.ophys import ImagingPlane
 
-from pynwb import docval, get_class, register_class
+from pynwb import H5DataIO, docval, get_class, register_class
 
 TempSpace = get_class("Space", "ndx-anatomical-localization")
 
+# Size of one unit in meters, used to rescale coordinates between spaces
+_UNIT_SCALES = {
+    "m": 1.0,
+    "mm": 1e-3,
+    "um": 1e-6,
+    "µm": 1e-6,
+    "μm": 1e-6,
+    "nm": 1e-9,
+}
+
+# Positive direction of each orientation letter in RAS coordinates
+_RAS_DIRECTIONS = {
+    "R": (1.0, 0.0, 0.0),
+    "L": (-1.0, 0.0, 0.0),
+    "A": (0.0, 1.0, 0.0),
+    "P": (0.0, -1.0, 0.0),
+    "S": (0.0, 0.0, 1.0),
+    "I": (0.0, 0.0, -1.0),
+}
+
+
+def _build_orientation_matrices() -> dict:
+    """Build the signed permutation matrix mapping (x, y, z) to RAS coordinates of each valid orientation code."""
+    matrices = {}
+    for letters in itertools.product(_RAS_DIRECTIONS, repeat=3):
+        matrix = np.array([_RAS_DIRECTIONS[letter] for letter in letters]).T
+        # Letters that repeat an anatomical dimension give a singular matrix
+        if abs(np.linalg.det(matrix)) == 1.0:
+            matrix.setflags(write=False)
+            matrices["".join(letters)] = matrix
+    return matrices
+
+
+# The 48 valid orientation codes, e.g. "RAS" or "PIR", and their axis matrices
+_ORIENTATION_MATRICES = _build_orientation_matrices()
+
+_INVALID_ORIENTATION_MESSAGE = (
+    "orientation must be a string of 3 letters from 'A', 'P', 'L', 'R', 'S', 'I' that covers each of the AP, LR, "
+    "and SI dimensions once, e.g. 'RAS'. Provided: {!r}"
+)
+
+
+@cache
+def _space_transform_matrix(source_orientation, source_units, target_orientation, target_units):
+    """Build the 4x4 homogeneous matrix mapping coordinates between two orientations and units.
+
+    Memoized on the (source, target) pair so repeated conversions reuse the same matrix.
+    """
+    for units in (source_units, target_units):
+        if units not in _UNIT_SCALES:
+            raise ValueError(f"Cannot convert coordinates in units '{units}'. Supported units: {list(_UNIT_SCALES)}")
+    for orientation in (source_orientation, target_orientation):
+        if orientation not in _ORIENTATION_MATRICES:
+            raise ValueError(_INVALID_ORIENTATION_MESSAGE.format(orientation))
+    scale = _UNIT_SCALES[source_units] / _UNIT_SCALES[target_units]
+
+    matrix = np.zeros((4, 4), dtype=np.float64)
+    matrix[3, 3] = 1.0
+    # Axis matrices are orthogonal, so the transpose maps RAS coordinates back to the target axes
+    matrix[:3, :3] = _ORIENTATION_MATRICES[target_orientation].T @ _ORIENTATION_MATRICES[source_orientation] * scale
+    matrix.setflags(write=False)
+    return matrix
+
 
 @register_class("Space", "ndx-anatomical-localization")
 class Space(TempSpace):
@@ -50,14 +120,8 @@ class Space(TempSpace):
         allow_positional=AllowPositional.ERROR,
     )
     def __init__(self, name, space_name, origin, units, orientation, extent=None):
-        assert len(orientation) == 3, "orientation must be a string of length 3"
-        valid_values = ["A", "P", "L", "R", "S", "I"]
-        for x in orientation:
-            assert x in valid_values, "orientation must be a string of 'A', 'P', 'L', 'R', 'S', 'I'"
-
-        map = {"A": "AP", "P": "AP", "L": "LR", "R": "LR", "S": "SI", "I": "SI"}
-        new_var = [map[var] for var in orientation]
-        assert len(set(new_var)) == 3, "orientation must be unique dimensions (AP, LR, SI)"
+        if orientation not in _ORIENTATION_MATRICES:
+            raise ValueError(_INVALID_ORIENTATION_MESSAGE.format(orientation))
 
         if extent is not None:
             extent = np.asarray(extent, dtype=np.float64)
@@ -70,6 +134,90 @@ class Space(TempSpace):
             name=name, space_name=space_name, origin=origin, units=units, orientation=orientation, extent=extent
         )
 
+    @classmethod
+    def get(cls, nwbfile) -> "Space":
+        """Get the canonical space of this class stored in an NWB file, adding it if the file has none yet.
+
+        Calling ``AllenCCFv3Space.get(nwbfile)`` for every table of a file gives all of them the same space object,
+        so the file stores a single group for it. The ``Localization`` lab metadata is created if needed.
+
+        Parameters
+        ----------
+        nwbfile : NWBFile
+            The NWB file.
+
+        Returns
+        -------
+        Space
+            The first space of exactly this class in the file's ``Localization``, or a new one.
+        """
+        if cls is Space:
+            raise TypeError("Space.get is only available for canonical spaces, e.g. AllenCCFv3Space.get(nwbfile)")
+        localization = nwbfile.lab_meta_data.get("localization")
+        if localization is None:
+            localization = Localization()
+            nwbfile.add_lab_meta_data([localization])
+        for space in localization.spaces.values():
+            if type(space) is cls:
+                return space
+        space = cls()
+        localization.add_spaces([space])
+        return space
+
+    def _get_identity(self) -> tuple:
+        """Get the values that define this space, which are equal for identical spaces whatever their names."""
+        extent = None if self.extent is None else tuple(np.asarray(self.extent[:], dtype=np.float64).tolist())
+        return (type(self), self.space_name, self.origin, self.units, self.orientation, extent)
+
+    @property
+    def axis_matrix(self) -> np.ndarray:
+        """The 3x3 matrix mapping (x, y, z) coordinates in this space to right, anterior, superior (RAS) directions.
+
+        Each column is the RAS direction of the positive x, y, or z axis, so the matrix is a signed permutation.
+        The matrices of all 48 valid orientation codes are precomputed and read-only.
+        """
+        return _ORIENTATION_MATRICES[self.orientation]
+
+    def get_transform_matrix(self, other_space: "Space") -> np.ndarray:
+        """Get the 4x4 homogeneous matrix that maps coordinates in this space to ``other_space``.
+
+        The matrix permutes and flips axes according to the ``orientation`` of both spaces and rescales
+        according to their ``units``. The ``origin`` of a space is a free-text description, so both spaces
+        are assumed to share the same (0, 0, 0) and the translation part of the matrix is zero.
+
+        Parameters
+        ----------
+        other_space : Space
+            The space to convert coordinates into.
+
+        Returns
+        -------
+        np.ndarray of shape (4, 4), dtype float64
+            Read-only matrix, cached per (source, target) orientation and units.
+        """
+        return _space_transform_matrix(self.orientation, self.units, other_space.orientation, other_space.units)
+
+    def transform_to(self, other_space: "Space", coords) -> np.ndarray:
+        """Convert coordinates from this space to ``other_space``.
+
+        Parameters
+        ----------
+        other_space : Space
+            The space to convert coordinates into.
+        coords : array-like of shape (N, 3) or (3,)
+            Coordinates (x, y, z) in this space.
+
+        Returns
+        -------
+        np.ndarray of the same shape as ``coords``, dtype float64
+            Coordinates (x, y, z) in ``other_space``.
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        if coords.shape[-1:] != (3,):
+            raise ValueError(f"coords must have shape (N, 3) or (3,). Provided shape: {coords.shape}")
+        matrix = self.get_transform_matrix(other_space)
+        return coords @ matrix[:3, :3].T + matrix[:3, 3]
+
 
 # Get AllenCCFv3Space AFTER Space is registered, so it can see the registered Space class
 TempAllenCCFv3Space = get_class("AllenCCFv3Space", "ndx-anatomical-localization")
@@ -222,28 +370,183 @@ TempBrainRegionMasks = get_class("BrainRegionMasks", "ndx-anatomical-localizatio
 
 @register_class("BrainRegionMasks", "ndx-anatomical-localization")
 class BrainRegionMasks(TempBrainRegionMasks):
-    def _to_image(self, image_height: int, image_width: int) -> np.ndarray:
+    @classmethod
+    def from_label_image(cls, name: str, description: str, label_image, encoding: str = "rle") -> "BrainRegionMasks":
+        """Create a BrainRegionMasks table from a dense 2D label image.
+
+        Parameters
+        ----------
+        name : str
+            Name of the table.
+        description : str
+            Description of the table.
+        label_image : array-like of shape (image_height, image_width)
+            Brain region ID of each pixel. Pixels with ID 0 are background and are not stored.
+        encoding : {"rle", "pixel"}, optional
+            "rle" stores one row per horizontal run of pixels with the same brain region ID, with the run length in
+            the ``run_length`` column. "pixel" stores one row per pixel. Defaults to "rle".
+
+        Returns
+        -------
+        BrainRegionMasks
+        """
+        label_image = np.asarray(label_image)
+        if label_image.ndim != 2:
+            raise ValueError(f"label_image must be a 2D array. Provided shape: {label_image.shape}")
+        if encoding not in ("rle", "pixel"):
+            raise ValueError(f'"encoding" must be "rle" or "pixel". Provided: "{encoding}"')
+
+        if encoding == "pixel":
+            ys, xs = np.nonzero(label_image)
+            ids = label_image[ys, xs]
+            run_lengths = None
+        else:
+            # A run starts at the first pixel of each row and wherever the ID differs from the previous pixel
+            height, width = label_image.shape
+            starts = np.ones(label_image.shape, dtype=bool)
+            starts[:, 1:] = label_image[:, 1:] != label_image[:, :-1]
+            ys, xs = np.nonzero(starts)
+            ids = label_image[ys, xs]
+            flat_starts = ys * width + xs
+            run_lengths = np.diff(flat_starts, append=height * width)
+            foreground = ids != 0
+            ys, xs, ids, run_lengths = ys[foreground], xs[foreground], ids[foreground], run_lengths[foreground]
+
+        data = {"x": xs, "y": ys, "brain_region_id": ids, "run_length": run_lengths}
+        columns = [
+            VectorData(name=spec["name"], description=spec["description"], data=data[spec["name"]].astype(np.int32))
+            for spec in cls.__columns__
+            if data[spec["name"]] is not None
+        ]
+        return cls(name=name, description=description, columns=columns)
+
+    def _get_pixels(self):
+        """Get the (x, y, brain_region_id) of every masked pixel, expanding run-length encoded rows."""
+        xs = np.asarray(self["x"].data[:], dtype=np.int64)
+        ys = np.asarray(self["y"].data[:], dtype=np.int64)
+        ids = np.asarray(self["brain_region_id"].data[:])
+        if "run_length" not in self.colnames:
+            return xs, ys, ids
+
+        run_lengths = np.asarray(self["run_length"].data[:], dtype=np.int64)
+        run_offsets = np.arange(run_lengths.sum()) - np.repeat(np.cumsum(run_lengths) - run_lengths, run_lengths)
+        xs = np.repeat(xs, run_lengths) + run_offsets
+        return xs, np.repeat(ys, run_lengths), np.repeat(ids, run_lengths)
+
+    def to_image(self, shape, dtype=None, out=None) -> np.ndarray:
         """Reconstruct a 2D brain region ID array from the flat (x, y, brain_region_id) table.
 
+        Run-length encoded rows (see :py:meth:`from_label_image`) are expanded to their pixels. The reconstructed
+        image is cached and reused by subsequent calls with the same ``shape`` and ``dtype`` until rows are added
+        to the table. Only adding rows invalidates the cache: edits to the column data in place are not detected.
+
         Parameters
         ----------
-        image_height : int
-            Height of the output array in pixels.
-        image_width : int
-            Width of the output array in pixels.
+        shape : tuple of int
+            The (image_height, image_width) of the output array in pixels.
+        dtype : np.dtype, optional
+            Integer dtype of the output array. Defaults to the smallest integer dtype that fits all brain region IDs.
+        out : np.ndarray, optional
+            Preallocated array of shape ``shape`` to write the image into. If provided, ``dtype`` defaults to
+            ``out.dtype``.
 
         Returns
         -------
-        np.ndarray of shape (image_height, image_width), dtype int32
+        np.ndarray of shape ``shape``
             Each pixel contains the brain_region_id at that location, or 0 where no mask entry exists.
+            The returned array is read-only unless ``out`` is provided.
         """
-        img = np.zeros((image_height, image_width), dtype=np.int32)
-        xs = self["x"].data[:]
-        ys = self["y"].data[:]
-        ids = self["brain_region_id"].data[:]
-        img[ys, xs] = ids
+        shape = tuple(int(n) for n in shape)
+        if out is not None:
+            if out.shape != shape:
+                raise ValueError(f'"out" must have shape {shape}. Provided shape: {out.shape}')
+            dtype = out.dtype if dtype is None else dtype
+
+        cache_key = (shape, None if dtype is None else np.dtype(dtype), len(self))
+        cached = getattr(self, "_image_cache", None)
+        if cached is not None and cached[0] == cache_key:
+            img = cached[1]
+        else:
+            xs, ys, ids = self._get_pixels()
+            if dtype is None:
+                dtype = (
+                    np.result_type(np.min_scalar_type(ids.min()), np.min_scalar_type(ids.max()))
+                    if ids.size
+                    else np.uint8
+                )
+            img = np.zeros(shape, dtype=dtype)
+            img[ys, xs] = ids
+            img.setflags(write=False)
+            self._image_cache = (cache_key, img)
+
+        if out is not None:
+            np.copyto(out, img)
+            return out
         return img
 
+    def extract_traces(self, series, reducer: str = "mean", chunk_frames: int = 100):
+        """Compute per-region activity time courses from an imaging series.
+
+        The mask rows are grouped once into a compressed sparse row (CSR) layout of regions x pixels, and each chunk
+        of frames streamed from ``series.data`` is reduced over the pixels of every region in a single vectorized
+        call. Only the bounding box of the masked pixels is read from each chunk.
+
+        Parameters
+        ----------
+        series : OnePhotonSeries or TwoPhotonSeries
+            Imaging series whose ``data`` has shape (n_frames, height, width). The mask ``x`` indexes the width
+            and ``y`` the height of each frame.
+        reducer : {"mean", "sum", "max", "min"}, optional
+            How to combine the pixels of each region in a frame. Defaults to "mean".
+        chunk_frames : int, optional
+            Number of frames read from ``series.data`` at a time. Defaults to 100.
+
+        Returns
+        -------
+        brain_region_ids : np.ndarray of shape (n_regions,)
+            The sorted, unique brain region IDs in the table.
+        traces : np.ndarray of shape (n_frames, n_regions), dtype float64
+            The reduced activity of each region in each frame.
+        """
+        reducers = {"mean": np.add, "sum": np.add, "max": np.maximum, "min": np.minimum}
+        if reducer not in reducers:
+            raise ValueError(f'"reducer" must be one of {list(reducers)}. Provided: "{reducer}"')
+        if chunk_frames <= 0:
+            raise ValueError(f'"chunk_frames" must be positive. Provided: {chunk_frames}')
+
+        data = series.data
+        if len(data.shape) != 3:
+            raise ValueError(f"series data must have shape (n_frames, height, width). Provided shape: {data.shape}")
+        n_frames = data.shape[0]
+
+        xs, ys, ids = self._get_pixels()
+        if xs.size == 0:
+            return ids[:0], np.empty((n_frames, 0), dtype=np.float64)
+        if xs.min() < 0 or ys.min() < 0 or ys.max() >= data.shape[1] or xs.max() >= data.shape[2]:
+            raise ValueError(f"Mask pixels are out of bounds for frames of shape {tuple(data.shape[1:])}")
+
+        # CSR layout: pixel indices (within the bounding box) sorted by region, with region start offsets
+        rows = slice(int(ys.min()), int(ys.max()) + 1)
+        cols = slice(int(xs.min()), int(xs.max()) + 1)
+        box_width = cols.stop - cols.start
+        order = np.argsort(ids, kind="stable")
+        indices = (ys[order] - rows.start) * box_width + (xs[order] - cols.start)
+        brain_region_ids, indptr, counts = np.unique(ids[order], return_index=True, return_counts=True)
+
+        ufunc = reducers[reducer]
+        traces = np.empty((n_frames, brain_region_ids.size), dtype=np.float64)
+        for start in range(0, n_frames, chunk_frames):
+            stop = min(start + chunk_frames, n_frames)
+            frames = np.asarray(data[start:stop, rows, cols], dtype=np.float64).reshape(stop - start, -1)
+            traces[start:stop] = ufunc.reduceat(frames[:, indices], indptr, axis=1)
+        if reducer == "mean":
+            traces /= counts
+        return brain_region_ids, traces
+
+    def _to_image(self, image_height: int, image_width: int) -> np.ndarray:
+        """Reconstruct a new, writable 2D int32 brain region ID array. See :py:meth:`to_image`."""
+        return self.to_image((image_height, image_width), out=np.empty((image_height, image_width), dtype=np.int32))
+
 
 Landmarks = get_class("Landmarks", "ndx-anatomical-localization")
 
@@ -274,6 +577,219 @@ class AffineTransformation(TempAffineTransformation):
         kwargs["affine_matrix"] = affine_matrix
         super().__init__(**kwargs)
 
+    @classmethod
+    def from_landmarks(
+        cls,
+        landmarks: Landmarks,
+        name: str = "affine_transformation",
+        weighted: bool = True,
+        robust: str | None = None,
+        threshold: float = 3.0,
+        n_hypotheses: int = 1000,
+        seed: int = 0,
+    ) -> "AffineTransformation":
+        """Fit the affine transformation that maps the source to the reference coordinates of landmarks.
+
+        The fit is a least-squares solve over all landmarks, weighted by their ``confidence`` if available. With
+        ``robust="ransac"``, a batch of ``n_hypotheses`` exact fits to random triplets of landmarks is scored at
+        once, and the final least-squares fit uses only the landmarks within ``threshold`` of the best hypothesis.
+
+        Parameters
+        ----------
+        landmarks : Landmarks
+            Landmarks with ``source_x``, ``source_y``, ``reference_x``, and ``reference_y`` columns.
+        name : str, optional
+            Name of the transformation. Defaults to "affine_transformation".
+        weighted : bool, optional
+            Weight each landmark by its ``confidence`` column, if present. Defaults to True.
+        robust : {None, "ransac"}, optional
+            Robust fitting method. Defaults to None (plain least squares).
+        threshold : float, optional
+            Maximum residual, in reference space units, for a landmark to be a RANSAC inlier. Defaults to 3.0.
+        n_hypotheses : int, optional
+            Number of RANSAC hypotheses. Defaults to 1000.
+        seed : int, optional
+            Seed of the random number generator used by RANSAC, for deterministic fits. Defaults to 0.
+
+        Returns
+        -------
+        AffineTransformation
+            Use :py:meth:`residuals` to get the residual of each landmark.
+        """
+        if robust not in (None, "ransac"):
+            raise ValueError(f'"robust" must be None or "ransac". Provided: "{robust}"')
+        source, reference = cls._get_landmark_points(landmarks)
+        n_landmarks = len(source)
+        if n_landmarks < 3:
+            raise ValueError(
+                f"At least 3 landmarks are required to fit an affine transformation. Provided: {n_landmarks}"
+            )
+        weights = np.ones(n_landmarks)
+        if weighted and "confidence" in landmarks.colnames:
+            weights = np.asarray(landmarks["confidence"].data[:], dtype=np.float64)
+
+        # Homogeneous source coordinates: reference = design @ params, with params of shape (3, 2)
+        design = np.column_stack([source, np.ones(n_landmarks)])
+        inliers = weights > 0
+        if robust == "ransac":
+            rng = np.random.default_rng(seed)
+            samples = np.argsort(rng.random((n_hypotheses, n_landmarks)), axis=1)[:, :3]
+            sample_design = design[samples]
+            # Collinear triplets have no unique solution
+            solvable = np.abs(np.linalg.det(sample_design)) > 1e-9
+            if np.any(solvable):
+                params = np.linalg.solve(sample_design[solvable], reference[samples[solvable]])
+                errors = np.linalg.norm(np.einsum("nk,hkd->hnd", design, params) - reference, axis=2)
+                within = errors <= threshold
+                scores = (within * weights).sum(axis=1)
+                inlier_error = np.where(within, errors**2, 0.0).sum(axis=1)
+                best = np.lexsort((inlier_error, -scores))[0]
+                inliers &= within[best]
+
+        sqrt_weights = np.sqrt(weights[inliers])[:, None]
+        params, *_ = np.linalg.lstsq(design[inliers] * sqrt_weights, reference[inliers] * sqrt_weights, rcond=None)
+        affine_matrix = np.vstack([params.T, [0.0, 0.0, 1.0]])
+        return cls(name=name, affine_matrix=affine_matrix)
+
+    @staticmethod
+    def _get_landmark_points(landmarks: Landmarks):
+        missing = [c for c in ("reference_x", "reference_y") if c not in landmarks.colnames]
+        if missing:
+            raise ValueError(f"Landmarks must have {missing} columns to fit an affine transformation")
+        source = np.column_stack([landmarks["source_x"].data[:], landmarks["source_y"].data[:]]).astype(np.float64)
+        reference = np.column_stack([landmarks["reference_x"].data[:], landmarks["reference_y"].data[:]])
+        return source, reference.astype(np.float64)
+
+    def residuals(self, landmarks: Landmarks) -> np.ndarray:
+        """Get the distance between the transformed source and the reference coordinates of each landmark.
+
+        Parameters
+        ----------
+        landmarks : Landmarks
+            Landmarks with ``source_x``, ``source_y``, ``reference_x``, and ``reference_y`` columns.
+
+        Returns
+        -------
+        np.ndarray of shape (n_landmarks,), dtype float64
+            The residual of each landmark, in reference space units.
+        """
+        source, reference = self._get_landmark_points(landmarks)
+        return np.linalg.norm(self.apply(source) - reference, axis=1)
+
+    def apply(self, points) -> np.ndarray:
+        """Apply the transformation to a set of 2D points.
+
+        Parameters
+        ----------
+        points : array-like of shape (N, 2) or (2,)
+            The (x, y) coordinates of the points in the source space.
+
+        Returns
+        -------
+        np.ndarray of the same shape as ``points``, dtype float64
+            The (x, y) coordinates of the points in the reference space.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if points.shape[-1:] != (2,):
+            raise ValueError(f"points must have shape (N, 2) or (2,). Provided shape: {points.shape}")
+        matrix = np.asarray(self.affine_matrix)
+        return points @ matrix[:2, :2].T + matrix[:2, 2]
+
+    def inverse(self) -> "AffineTransformation":
+        """Get the inverse transformation, mapping the reference space back to the source space.
+
+        The inverse is computed once and cached.
+
+        Returns
+        -------
+        AffineTransformation
+        """
+        if getattr(self, "_inverse", None) is None:
+            self._inverse = AffineTransformation(
+                name=f"{self.name}_inverse", affine_matrix=np.linalg.inv(np.asarray(self.affine_matrix))
+            )
+        return self._inverse
+
+    def compose(self, other: "AffineTransformation", name: str | None = None) -> "AffineTransformation":
+        """Get the transformation that applies this transformation followed by ``other``.
+
+        Parameters
+        ----------
+        other : AffineTransformation
+            The transformation to apply after this one.
+        name : str, optional
+            Name of the composed transformation. Defaults to "<self.name>_<other.name>".
+
+        Returns
+        -------
+        AffineTransformation
+        """
+        return AffineTransformation(
+            name=name or f"{self.name}_{other.name}",
+            affine_matrix=np.asarray(other.affine_matrix) @ np.asarray(self.affine_matrix),
+        )
+
+    def warp_image(self, image, output_shape, order: int = 1, fill_value=0, tile_rows: int = 256) -> np.ndarray:
+        """Resample a source image into the reference space.
+
+        Each output pixel (row, col) is the point (x=col, y=row) of the reference space; it is mapped back to the
+        source image with the cached inverse transformation and sampled there. The output is computed in blocks of
+        ``tile_rows`` rows, so intermediate coordinate arrays stay bounded by the tile size.
+
+        Parameters
+        ----------
+        image : array-like or Image
+            Source image of shape (height, width) or (height, width, channels).
+        output_shape : tuple of int
+            The (height, width) of the output image.
+        order : {0, 1}, optional
+            Interpolation order: 0 for nearest neighbour, 1 for bilinear. Defaults to 1.
+        fill_value : scalar, optional
+            Value of output pixels that map outside the source image. Defaults to 0.
+        tile_rows : int, optional
+            Number of output rows computed at a time. Defaults to 256.
+
+        Returns
+        -------
+        np.ndarray of shape ``output_shape`` (plus the channels of ``image``)
+            The warped image, with the dtype of ``image`` for ``order=0`` and float64 for ``order=1``.
+        """
+        if order not in (0, 1):
+            raise ValueError(f'"order" must be 0 (nearest) or 1 (bilinear). Provided: {order}')
+        image = np.asarray(image.data if isinstance(image, Image) else image)
+        height, width = image.shape[:2]
+        output_height, output_width = output_shape
+        dtype = image.dtype if order == 0 else np.float64
+        out = np.full((output_height, output_width) + image.shape[2:], fill_value, dtype=dtype)
+        inverse = self.inverse()
+        cols = np.arange(output_width, dtype=np.float64)
+
+        for row_start in range(0, output_height, tile_rows):
+            rows = np.arange(row_start, min(row_start + tile_rows, output_height), dtype=np.float64)
+            grid = np.stack(np.broadcast_arrays(cols[None, :], rows[:, None]), axis=-1).reshape(-1, 2)
+            source_x, source_y = inverse.apply(grid).T
+            inside = (source_x >= -0.5) & (source_x < width - 0.5) & (source_y >= -0.5) & (source_y < height - 0.5)
+            tile = out[row_start : row_start + len(rows)].reshape((-1,) + image.shape[2:])
+            source_x, source_y = source_x[inside], source_y[inside]
+
+            if order == 0:
+                tile[inside] = image[np.rint(source_y).astype(np.int64), np.rint(source_x).astype(np.int64)]
+                continue
+
+            # Bilinear: clamp to the image so edge pixels interpolate against themselves
+            source_x = np.clip(source_x, 0, width - 1)
+            source_y = np.clip(source_y, 0, height - 1)
+            x0 = np.minimum(np.floor(source_x).astype(np.int64), max(width - 2, 0))
+            y0 = np.minimum(np.floor(source_y).astype(np.int64), max(height - 2, 0))
+            x1 = np.minimum(x0 + 1, width - 1)
+            y1 = np.minimum(y0 + 1, height - 1)
+            fx = (source_x - x0).reshape((-1,) + (1,) * (image.ndim - 2))
+            fy = (source_y - y0).reshape((-1,) + (1,) * (image.ndim - 2))
+            top = image[y0, x0] * (1 - fx) + image[y0, x1] * fx
+            bottom = image[y1, x0] * (1 - fx) + image[y1, x1] * fx
+            tile[inside] = top * (1 - fy) + bottom * fy
+        return out
+
 
 # AtlasRegistration: custom class validates that source_image and registered_image are provided.
 TempAtlasRegistration = get_class("AtlasRegistration", "ndx-anatomical-localization")
@@ -324,11 +840,245 @@ class AtlasRegistration(TempAtlasRegistration):
             raise ValueError("'source_image' must be provided in AtlasRegistration.__init__")
         super().__init__(**kwargs)
 
+    def to_coordinates_image(
+        self,
+        space: Space,
+        name: str = "anatomical_coordinates_image",
+        method: str = "affine atlas registration",
+        z_plane: float = 0.0,
+        localized_entity: ImagingPlane | None = None,
+        block_rows: int = 256,
+        parametric: bool = False,
+        stream: bool = False,
+        storage: dict | None = None,
+    ) -> "AnatomicalCoordinatesImage":
+        """Create the per-pixel coordinate map of the source image from the affine transformation.
+
+        The affine transformation maps each source pixel (x=col, y=row) to the x and y coordinates of ``space``;
+        every pixel is assigned the z coordinate ``z_plane``. The maps are computed in blocks of ``block_rows``
+        rows and written directly into float32 arrays, so no full-size float64 grid is allocated. With
+        ``parametric=True`` only the equivalent ``pixel_to_space_matrix`` is stored and coordinates are computed
+        on demand. With ``stream=True`` the x, y, and z maps are data chunk iterators that compute each block of
+        ``block_rows`` rows while the file is written, so the full-size maps are never held in memory.
+
+        Parameters
+        ----------
+        space : Space
+            The space of the coordinates.
+        name : str, optional
+            Name of the coordinates image. Defaults to "anatomical_coordinates_image".
+        method : str, optional
+            The method used to determine the coordinates. Defaults to "affine atlas registration".
+        z_plane : float, optional
+            The z coordinate of the imaged plane in ``space``. Defaults to 0.0.
+        localized_entity : ImagingPlane, optional
+            The imaging plane that the coordinate map applies to. Defaults to None.
+        block_rows : int, optional
+            Number of rows computed at a time. Defaults to 256.
+        parametric : bool, optional
+            Store the affine ``pixel_to_space_matrix`` instead of dense x, y, and z arrays. Defaults to False.
+        stream : bool, optional
+            Compute the dense x, y, and z arrays block by block while they are written. Defaults to False.
+        storage : dict, optional
+            HDF5 storage options for the dense x, y, and z arrays. See :py:class:`AnatomicalCoordinatesImage`.
+            Defaults to None, which stores the arrays as given.
+
+        Returns
+        -------
+        AnatomicalCoordinatesImage
+        """
+        if self.affine_transformation is None:
+            raise ValueError("AtlasRegistration must have an 'affine_transformation' to create a coordinates image")
+        if parametric and stream:
+            raise ValueError('"parametric" and "stream" cannot both be True')
+        # Reorder the (x=col, y=row) affine into one acting on pixel (i=row, j=col)
+        affine = np.asarray(self.affine_transformation.affine_matrix)
+        pixel_to_space_matrix = np.array(
+            [
+                [affine[0, 1], affine[0, 0], affine[0, 2]],
+                [affine[1, 1], affine[1, 0], affine[1, 2]],
+                [0, 0, z_plane],
+            ]
+        )
+        if parametric:
+            return AnatomicalCoordinatesImage(
+                name=name,
+                space=space,
+                method=method,
+                image=self.source_image,
+                localized_entity=localized_entity,
+                pixel_to_space_matrix=pixel_to_space_matrix,
+            )
+
+        height, width = self.source_image.data.shape[:2]
+        if stream:
+            # Buffers of whole chunk rows, so every buffer is written as complete tiles
+            chunk_shape = (min(height, _DEFAULT_COORDINATES_TILE), min(width, _DEFAULT_COORDINATES_TILE))
+            buffer_rows = min(height, -(-block_rows // chunk_shape[0]) * chunk_shape[0])
+            x, y, z = (
+                _AffinePlaneIterator(
+                    pixel_to_space_matrix,
+                    axis=axis,
+                    shape=(height, width),
+                    chunk_shape=chunk_shape,
+                    buffer_shape=(buffer_rows, width),
+                )
+                for axis in range(3)
+            )
+            return AnatomicalCoordinatesImage(
+                name=name,
+                space=space,
+                method=method,
+                image=self.source_image,
+                localized_entity=localized_entity,
+                x=x,
+                y=y,
+                z=z,
+                storage=storage,
+            )
+
+        x = np.empty((height, width), dtype=np.float32)
+        y = np.empty((height, width), dtype=np.float32)
+        cols = np.arange(width, dtype=np.float64)
+        for row_start in range(0, height, block_rows):
+            rows = np.arange(row_start, min(row_start + block_rows, height), dtype=np.float64)
+            grid = np.stack(np.broadcast_arrays(cols[None, :], rows[:, None]), axis=-1)
+            coords = self.affine_transformation.apply(grid.reshape(-1, 2)).reshape(len(rows), width, 2)
+            x[row_start : row_start + len(rows)] = coords[..., 0]
+            y[row_start : row_start + len(rows)] = coords[..., 1]
+
+        return AnatomicalCoordinatesImage(
+            name=name,
+            space=space,
+            method=method,
+            image=self.source_image,
+            localized_entity=localized_entity,
+            x=x,
+            y=y,
+            z=np.full((height, width), z_plane, dtype=np.float32),
+            storage=storage,
+        )
+
+
+class _GridIndex:
+    """Uniform grid over a set of 3D points for box, radius, and nearest-neighbour queries.
+
+    Points are sorted by the flat index of the grid cell that contains them, so the points of any cell are a
+    contiguous slice found with a binary search. Points with non-finite coordinates (e.g. NaN for an entity that
+    was not localized) are left out of the grid and never returned; queries return indices into ``points``.
+    """
+
+    def __init__(self, points: np.ndarray, points_per_cell: int = 8):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.indices = np.flatnonzero(np.isfinite(points).all(axis=1))
+        self.points = points[self.indices]
+        n_points = len(self.points)
+        if n_points == 0:
+            self.lower = self.upper = np.zeros(3)
+        else:
+            self.lower = self.points.min(axis=0)
+            self.upper = self.points.max(axis=0)
+        span = np.maximum(self.upper - self.lower, np.finfo(np.float64).eps)
+        # Choose a cubic cell size that gives ~points_per_cell points per cell for uniformly spread points, over
+        # the dimensions the points actually extend in (e.g. coordinates of an imaging plane are 2D)
+        extended = span > span.max() * 1e-6
+        volume = np.prod(span[extended]) * points_per_cell / max(n_points, 1)
+        self.cell_size = max(float(volume ** (1 / np.count_nonzero(extended))), span.max() / 1024)
+        self.shape = np.floor(span / self.cell_size).astype(np.int64) + 1
+
+        cell_ids = self._cell_ids(self._cells(self.points))
+        self.order = np.argsort(cell_ids, kind="stable")
+        self.sorted_cell_ids = cell_ids[self.order]
+
+    def _cells(self, points):
+        return np.clip(np.floor((points - self.lower) / self.cell_size).astype(np.int64), 0, self.shape - 1)
+
+    def _cell_ids(self, cells):
+        return np.ravel_multi_index(cells.T, self.shape)
+
+    def query_box(self, lower, upper) -> np.ndarray:
+        return self.indices[self._query_box(lower, upper)]
+
+    def _query_box(self, lower, upper) -> np.ndarray:
+        """Get the positions in ``self.points`` of the points inside the box, sorted."""
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+        if len(self.points) == 0 or np.any(upper < self.lower) or np.any(lower > self.upper):
+            return np.empty(0, dtype=np.int64)
+
+        first, last = self._cells(np.stack([lower, upper]))
+        if np.prod(last - first + 1) >= len(self.points):
+            candidates = np.arange(len(self.points))
+        else:
+            grids = np.meshgrid(*[np.arange(a, b + 1) for a, b in zip(first, last)], indexing="ij")
+            cell_ids = self._cell_ids(np.stack([g.ravel() for g in grids], axis=1))
+            starts = np.searchsorted(self.sorted_cell_ids, cell_ids, side="left")
+            stops = np.searchsorted(self.sorted_cell_ids, cell_ids, side="right")
+            lengths = stops - starts
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            candidates = self.order[positions]
+
+        inside = np.all((self.points[candidates] >= lower) & (self.points[candidates] <= upper), axis=1)
+        return np.sort(candidates[inside])
+
+    def query_radius(self, point, radius: float):
+        point = np.asarray(point, dtype=np.float64)
+        candidates = self._query_box(point - radius, point + radius)
+        distances = np.linalg.norm(self.points[candidates] - point, axis=1)
+        within = distances <= radius
+        candidates, distances = candidates[within], distances[within]
+        order = np.argsort(distances, kind="stable")
+        return self.indices[candidates[order]], distances[order]
+
+    def query_nearest(self, point, k: int):
+        point = np.asarray(point, dtype=np.float64)
+        k = min(k, len(self.points))
+        # Every point lies within this radius of the query, so the search always terminates
+        max_radius = np.linalg.norm(np.maximum(np.abs(self.upper - point), np.abs(point - self.lower)))
+        radius = self.cell_size
+        while True:
+            indices, distances = self.query_radius(point, radius)
+            if len(indices) >= k or radius >= max_radius:
+                return indices[:k], distances[:k]
+            radius = min(radius * 2, max_radius)
+
 
 # Get these AFTER Space and AllenCCFv3Space are registered
 TempAnatomicalCoordinatesTable = get_class("AnatomicalCoordinatesTable", "ndx-anatomical-localization")
 TempAnatomicalCoordinatesImage = get_class("AnatomicalCoordinatesImage", "ndx-anatomical-localization")
-Localization = get_class("Localization", "ndx-anatomical-localization")
+TempLocalization = get_class("Localization", "ndx-anatomical-localization")
+
+
+@register_class("Localization", "ndx-anatomical-localization")
+class Localization(TempLocalization):
+    def deduplicate_spaces(self) -> dict:
+        """Collapse identical spaces into one.
+
+        Spaces of the same type with the same ``space_name``, ``origin``, ``units``, ``orientation``, and ``extent``
+        are identical, whatever their names. The first of each group is kept: the coordinate tables and images that
+        link to the others are relinked to it, and the others are removed, so the file stores a single group.
+
+        Returns
+        -------
+        dict
+            Mapping from the name of each removed space to the name of the space that replaces it.
+        """
+        kept = {}
+        replacements = {}
+        for space in self.spaces.values():
+            replacement = kept.setdefault(space._get_identity(), space)
+            if replacement is not space:
+                replacements[space.name] = replacement
+
+        for container in [*self.anatomical_coordinates_tables.values(), *self.anatomical_coordinates_images.values()]:
+            replacement = replacements.get(container.space.name)
+            if replacement is not None and container.space is self.spaces[container.space.name]:
+                # Links are set once at construction, so the field is replaced directly
+                container.fields["space"] = replacement
+                container.set_modified()
+        for name in replacements:
+            self.spaces.pop(name)
+        return {name: replacement.name for name, replacement in replacements.items()}
 
 
 @register_class("AnatomicalCoordinatesTable", "ndx-anatomical-localization")
@@ -360,6 +1110,399 @@ class AnatomicalCoordinatesTable(TempAnatomicalCoordinatesTable):
 
         super().__init__(**kwargs)
 
+    @classmethod
+    def from_arrays(
+        cls,
+        name: str,
+        description: str,
+        space: Space,
+        method: str,
+        target: DynamicTable,
+        x,
+        y,
+        z,
+        localized_entity=None,
+        brain_region=None,
+        **columns,
+    ) -> "AnatomicalCoordinatesTable":
+        """Create a table from arrays of coordinates in a single call.
+
+        Parameters
+        ----------
+        name : str
+            Name of the table.
+        description : str
+            Description of the table.
+        space : Space
+            The space of the coordinates.
+        method : str
+            The method used to determine the coordinates.
+        target : DynamicTable
+            The table that contains the localized entities (e.g. the electrodes table).
+        x, y, z : array-like of shape (n_rows,)
+            The coordinates of each row.
+        localized_entity : array-like of shape (n_rows,), optional
+            Row indices into ``target``. Defaults to 0, 1, ..., n_rows - 1.
+        brain_region : array-like of shape (n_rows,), optional
+            The brain region of each row.
+        **columns
+            Values of additional custom columns, added with an empty description.
+
+        Returns
+        -------
+        AnatomicalCoordinatesTable
+        """
+        if localized_entity is None:
+            localized_entity = np.arange(len(np.asarray(x)))
+        values = cls._get_row_values(x, y, z, localized_entity, brain_region, columns)
+
+        # Columns hold the arrays themselves, which are written without converting each element
+        descriptions = {spec["name"]: spec["description"] for spec in cls.__columns__}
+        table_columns = [
+            DynamicTableRegion(name=key, description=descriptions[key], data=value, table=target)
+            if key == "localized_entity"
+            else VectorData(name=key, description=descriptions.get(key, ""), data=value)
+            for key, value in values.items()
+        ]
+        return cls(
+            name=name,
+            description=description,
+            space=space,
+            method=method,
+            columns=table_columns,
+            id=np.arange(len(values["x"])),
+        )
+
+    @staticmethod
+    def _get_row_values(x, y, z, localized_entity, brain_region, columns) -> dict:
+        """Get the values of each column as arrays, checking that they are 1D and of the same length."""
+        values = {"x": x, "y": y, "z": z, "localized_entity": localized_entity, **columns}
+        if brain_region is not None:
+            values["brain_region"] = brain_region
+        values = {key: np.asarray(value) for key, value in values.items()}
+        n_rows = len(values["x"])
+        bad_shapes = {key: value.shape for key, value in values.items() if value.shape != (n_rows,)}
+        if bad_shapes:
+            raise ValueError(f"All columns must be 1D arrays of length {n_rows}. Provided shapes: {bad_shapes}")
+        if not np.issubdtype(values["localized_entity"].dtype, np.integer) and n_rows:
+            raise ValueError('"localized_entity" must contain integer row indices into the target table')
+        return values
+
+    def add_rows(self, x, y, z, localized_entity, brain_region=None, **columns):
+        """Append many rows at once from arrays.
+
+        Shapes are validated once and each column is extended in a single call, instead of one
+        :py:meth:`add_row` call per row.
+
+        Parameters
+        ----------
+        x, y, z : array-like of shape (n_rows,)
+            The coordinates of each row.
+        localized_entity : array-like of int, shape (n_rows,)
+            Row indices into the target table of the ``localized_entity`` column.
+        brain_region : array-like of shape (n_rows,), optional
+            The brain region of each row. Required if the table already has a ``brain_region`` column.
+        **columns
+            Values of the other columns of the table, each of shape (n_rows,).
+        """
+        values = self._get_row_values(x, y, z, localized_entity, brain_region, columns)
+        n_rows = len(values["x"])
+
+        if brain_region is not None and "brain_region" not in self.colnames:
+            if len(self):
+                raise ValueError('Cannot add "brain_region" values to a table whose existing rows have none')
+            self.add_column(name="brain_region", description="The brain region associated with the localization")
+        missing = set(self.colnames) - set(values)
+        extra = set(values) - set(self.colnames)
+        if missing or extra:
+            raise ValueError(f"Values must match the table columns. Missing: {sorted(missing)}, extra: {sorted(extra)}")
+
+        for key, value in values.items():
+            column = self[key]
+            column.extend(value.tolist() if isinstance(column.data, list) else value)
+        first_id = len(self.id)
+        self.id.extend(list(range(first_id, first_id + n_rows)))
+
+    def to_space(self, space: Space) -> np.ndarray:
+        """Get the coordinates of all rows converted to another space.
+
+        Parameters
+        ----------
+        space : Space
+            The space to convert the coordinates into.
+
+        Returns
+        -------
+        np.ndarray of shape (n_rows, 3), dtype float64
+            The (x, y, z) coordinates of each row in ``space``.
+        """
+        coords = np.column_stack([self["x"].data[:], self["y"].data[:], self["z"].data[:]])
+        return self.space.transform_to(space, coords)
+
+    @staticmethod
+    def _gather_column(column, rows: np.ndarray):
+        """Read the values of a column at the given rows with a single contiguous read of the rows' span."""
+        if isinstance(column, VectorIndex):
+            values = column[:] if len(rows) else []
+            return np.array([values[row] for row in rows] + [None], dtype=object)[:-1]
+        if not len(rows):
+            return np.asarray(column.data[:0])
+        first, last = int(rows.min()), int(rows.max())
+        block = column.data[first : last + 1]
+        if isinstance(block, list) and block and not np.isscalar(block[0]):
+            block = np.array(block + [None], dtype=object)[:-1]
+        return np.asarray(block)[rows - first]
+
+    def _get_columns(self, columns=None, join_target: bool = True, target_columns=None, target_prefix=None):
+        """Read the requested columns, optionally joined with the target table, as a dict of arrays."""
+        columns = list(self.colnames if columns is None else columns)
+        unknown = set(columns) - set(self.colnames)
+        if unknown:
+            raise ValueError(f"Columns not in {self.name}: {sorted(unknown)}")
+        ids = np.asarray(self.id.data[:])
+        all_rows = np.arange(len(ids))
+        data = {name: self._gather_column(self[name], all_rows) for name in columns}
+        if not join_target:
+            return ids, data
+
+        region = self["localized_entity"]
+        target = region.table
+        target_columns = list(target.colnames if target_columns is None else target_columns)
+        unknown = set(target_columns) - set(target.colnames)
+        if unknown:
+            raise ValueError(f"Columns not in {target.name}: {sorted(unknown)}")
+        target_prefix = f"{target.name}_" if target_prefix is None else target_prefix
+        target_rows = np.asarray(region.data[:], dtype=np.int64)
+        data[f"{target_prefix}id"] = self._gather_column(target.id, target_rows)
+        for name in target_columns:
+            data[f"{target_prefix}{name}"] = self._gather_column(target[name], target_rows)
+        return ids, data
+
+    def to_joined_dataframe(self, columns=None, target_columns=None, target_prefix=None):
+        """Get the table as a flat DataFrame joined with the ``localized_entity`` target table.
+
+        The ``localized_entity`` indices are resolved with one vectorized gather per target column, and only the
+        requested columns are read, instead of materializing a nested DataFrame row by row as
+        :py:meth:`to_dataframe` does. ``localized_entity`` holds the target row indices.
+
+        Parameters
+        ----------
+        columns : list of str, optional
+            Columns of this table to include. Defaults to all columns.
+        target_columns : list of str, optional
+            Columns of the target table to include. Defaults to all columns.
+        target_prefix : str, optional
+            Prefix of the target table columns. Defaults to the name of the target table followed by "_", so the
+            ``x`` column of the electrodes table becomes ``electrodes_x``.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per row of this table, indexed by ``id``.
+        """
+        ids, data = self._get_columns(columns, True, target_columns, target_prefix)
+        return pd.DataFrame(data, index=pd.Index(ids, name="id"))
+
+    def to_arrow(self, columns=None, join_target: bool = True, target_columns=None, target_prefix=None):
+        """Get the table as a ``pyarrow.Table``, optionally joined with the ``localized_entity`` target table.
+
+        Numeric columns are handed to Arrow without copying. Arrow cannot hold NWB objects, so columns of
+        containers, such as the ``group`` column of the electrodes table, hold the name of each container.
+        Requires ``pyarrow``.
+
+        Parameters
+        ----------
+        columns, target_columns, target_prefix
+            See :py:meth:`to_joined_dataframe`.
+        join_target : bool, optional
+            Whether to add the columns of the target table (e.g. the electrodes table) for each row. If False,
+            ``localized_entity`` holds the target row indices. Defaults to True.
+
+        Returns
+        -------
+        pyarrow.Table
+            One row per row of this table, with the table ids in the ``id`` column.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("pyarrow is required for to_arrow. Install it with `pip install pyarrow`.") from e
+
+        ids, data = self._get_columns(columns, join_target, target_columns, target_prefix)
+        arrays = {"id": ids}
+        for name, values in data.items():
+            if values.dtype == object:
+                values = [value.name if isinstance(value, AbstractContainer) else value for value in values.tolist()]
+            arrays[name] = values
+        return pa.table(arrays)
+
+    def annotate_regions(self, label_volume, resolution, ontology=None, id_column: str | None = None) -> np.ndarray:
+        """Assign a brain region to every row by looking up its coordinates in an atlas annotation volume.
+
+        The voxel of every row is computed at once and the volume is read with a single sorted, deduplicated
+        gather, so memory-mapped volumes only load the pages that contain the localized entities.
+
+        Parameters
+        ----------
+        label_volume : np.ndarray or str or Path
+            3D array of integer brain region IDs whose axes follow the x, y, and z axes of the table's space, with
+            voxel (0, 0, 0) at the origin of the space. A path to a ``.npy`` file is opened memory-mapped.
+        resolution : float or array-like of shape (3,)
+            Size of a voxel along x, y, and z, in the units of the table's space.
+        ontology : dict, optional
+            Mapping from brain region ID to brain region name. If provided, the ``brain_region`` column is filled
+            with the name of each row's region, or an empty string for IDs that are not in the ontology.
+        id_column : str, optional
+            Name of an integer column to fill with each row's brain region ID. Defaults to None (not stored).
+
+        Returns
+        -------
+        np.ndarray of shape (n_rows,)
+            The brain region ID of each row. Rows outside the volume or with NaN coordinates are assigned 0.
+        """
+        if isinstance(label_volume, (str, os.PathLike)):
+            label_volume = np.load(label_volume, mmap_mode="r")
+        if label_volume.ndim != 3:
+            raise ValueError(f"label_volume must be a 3D array. Provided shape: {label_volume.shape}")
+        resolution = np.broadcast_to(np.asarray(resolution, dtype=np.float64), (3,))
+        if np.any(resolution <= 0):
+            raise ValueError("resolution values must be positive")
+
+        coords = np.column_stack([self["x"].data[:], self["y"].data[:], self["z"].data[:]])
+        # Rows that were not localized have NaN coordinates and no voxel
+        finite = np.isfinite(coords).all(axis=1)
+        voxels = np.zeros(coords.shape, dtype=np.int64)
+        voxels[finite] = np.floor(coords[finite] / resolution).astype(np.int64)
+        inside = finite & np.all((voxels >= 0) & (voxels < label_volume.shape), axis=1)
+
+        region_ids = np.zeros(len(coords), dtype=label_volume.dtype)
+        flat_voxels = np.ravel_multi_index(voxels[inside].T, label_volume.shape)
+        unique_voxels, inverse = np.unique(flat_voxels, return_inverse=True)
+        region_ids[inside] = label_volume[np.unravel_index(unique_voxels, label_volume.shape)][inverse]
+
+        if ontology is not None:
+            unique_ids, inverse = np.unique(region_ids, return_inverse=True)
+            names = np.array([ontology.get(int(region_id), "") for region_id in unique_ids], dtype=object)
+            self._set_column("brain_region", "The brain region associated with the localization", names[inverse])
+        if id_column is not None:
+            self._set_column(id_column, "The brain region ID associated with the localization", region_ids)
+        return region_ids
+
+    def _set_column(self, name: str, description: str, values: np.ndarray):
+        """Replace the values of a column in place, or add the column if it does not exist yet."""
+        if name in self.colnames:
+            self[name].data[:] = values.tolist() if isinstance(self[name].data, list) else values
+        else:
+            self.add_column(name=name, description=description, data=values.tolist())
+
+    def _get_spatial_index(self) -> _GridIndex:
+        """Get the spatial index over the (x, y, z) columns, building it on first use or after rows are added."""
+        cached = getattr(self, "_spatial_index", None)
+        if cached is None or cached[0] != len(self):
+            coords = np.column_stack([self["x"].data[:], self["y"].data[:], self["z"].data[:]])
+            cached = (len(self), _GridIndex(coords))
+            self._spatial_index = cached
+        return cached[1]
+
+    def _with_localized_entities(self, rows: np.ndarray):
+        return rows, np.asarray(self["localized_entity"].data[:])[rows]
+
+    def query_box(self, lower, upper):
+        """Find the rows whose coordinates lie within an axis-aligned box.
+
+        Parameters
+        ----------
+        lower : array-like of shape (3,)
+            The (x, y, z) lower corner of the box, inclusive.
+        upper : array-like of shape (3,)
+            The (x, y, z) upper corner of the box, inclusive.
+
+        Returns
+        -------
+        rows : np.ndarray of int
+            Indices of the matching rows of this table, in increasing order.
+        localized_entities : np.ndarray of int
+            Indices of the matching rows in the ``localized_entity`` target table.
+        """
+        return self._with_localized_entities(self._get_spatial_index().query_box(lower, upper))
+
+    def query_radius(self, point, radius: float):
+        """Find the rows whose coordinates lie within ``radius`` of a point.
+
+        Parameters
+        ----------
+        point : array-like of shape (3,)
+            The (x, y, z) query point, in the units of the table's space.
+        radius : float
+            The search radius, in the units of the table's space.
+
+        Returns
+        -------
+        rows : np.ndarray of int
+            Indices of the matching rows of this table, sorted by distance to ``point``.
+        localized_entities : np.ndarray of int
+            Indices of the matching rows in the ``localized_entity`` target table.
+        """
+        rows, _ = self._get_spatial_index().query_radius(point, radius)
+        return self._with_localized_entities(rows)
+
+    def query_nearest(self, point, k: int = 1):
+        """Find the ``k`` rows whose coordinates are nearest to a point.
+
+        Parameters
+        ----------
+        point : array-like of shape (3,)
+            The (x, y, z) query point, in the units of the table's space.
+        k : int, optional
+            The number of rows to return. Defaults to 1.
+
+        Returns
+        -------
+        rows : np.ndarray of int
+            Indices of the nearest rows of this table, sorted by distance to ``point``.
+        localized_entities : np.ndarray of int
+            Indices of the nearest rows in the ``localized_entity`` target table.
+        """
+        rows, _ = self._get_spatial_index().query_nearest(point, k)
+        return self._with_localized_entities(rows)
+
+
+_DEFAULT_COORDINATES_TILE = 256
+
+
+def _get_data_shape(data) -> tuple:
+    """Get the shape of an array, DataIO, or data chunk iterator without loading its data.
+
+    Sizes that a data chunk iterator does not know in advance are None.
+    """
+    return tuple(get_data_shape(data, strict_no_data_load=True))
+
+
+def _shapes_match(shape: tuple, expected: tuple) -> bool:
+    """Check that a shape matches the expected shape, treating unknown (None) sizes as matching."""
+    return len(shape) == len(expected) and all(n is None or n == m for n, m in zip(shape, expected))
+
+
+class _AffinePlaneIterator(GenericDataChunkIterator):
+    """One coordinate plane of an affine coordinate map, computed buffer by buffer as it is written."""
+
+    def __init__(self, pixel_to_space_matrix, axis: int, shape: tuple, **kwargs):
+        self._coefficients = np.asarray(pixel_to_space_matrix, dtype=np.float64)[axis]
+        self._shape = tuple(shape)
+        super().__init__(**kwargs)
+
+    def _get_data(self, selection: tuple) -> np.ndarray:
+        rows = np.arange(*selection[0].indices(self._shape[0]), dtype=np.float64)
+        cols = np.arange(*selection[1].indices(self._shape[1]), dtype=np.float64)
+        ci, cj, offset = self._coefficients
+        return (rows[:, None] * ci + cols[None, :] * cj + offset).astype(np.float32)
+
+    def _get_maxshape(self) -> tuple:
+        return self._shape
+
+    def _get_dtype(self) -> np.dtype:
+        return np.dtype(np.float32)
+
 
 @register_class("AnatomicalCoordinatesImage", "ndx-anatomical-localization")
 class AnatomicalCoordinatesImage(TempAnatomicalCoordinatesImage):
@@ -386,17 +1529,38 @@ class AnatomicalCoordinatesImage(TempAnatomicalCoordinatesImage):
         {
             "name": "x",
             "type": ("array_data", "data"),
-            "doc": "2D array containing X coordinates for each pixel (width x height)",
+            "doc": (
+                "2D array containing X coordinates for each pixel (width x height), or a data chunk iterator "
+                "that streams them"
+            ),
+            "default": None,
         },
         {
             "name": "y",
             "type": ("array_data", "data"),
-            "doc": "2D array containing Y coordinates for each pixel (width x height)",
+            "doc": (
+                "2D array containing Y coordinates for each pixel (width x height), or a data chunk iterator "
+                "that streams them"
+            ),
+            "default": None,
         },
         {
             "name": "z",
             "type": ("array_data", "data"),
-            "doc": "2D array containing Z coordinates for each pixel (width x height)",
+            "doc": (
+                "2D array containing Z coordinates for each pixel (width x height), or a data chunk iterator "
+                "that streams them"
+            ),
+            "default": None,
+        },
+        {
+            "name": "pixel_to_space_matrix",
+            "type": "array_data",
+            "doc": (
+                "3x3 affine matrix A giving the coordinates of each pixel (i, j) as [x, y, z] = A @ [i, j, 1]. "
+                "Use instead of x, y, and z when the coordinate map is an affine function of the pixel position."
+            ),
+            "default": None,
         },
         {
             "name": "brain_region",
@@ -404,6 +1568,43 @@ class AnatomicalCoordinatesImage(TempAnatomicalCoordinatesImage):
             "doc": "2D array of brain region names for each pixel",
             "default": None,
         },
+        {
+            "name": "brain_region_index",
+            "type": ("array_data", "data"),
+            "doc": (
+                "2D array of indices into brain_region_names giving the brain region of each pixel, or a data chunk "
+                "iterator that streams them"
+            ),
+            "default": None,
+        },
+        {
+            "name": "brain_region_names",
+            "type": ("array_data", "data"),
+            "doc": "The brain region names referenced by brain_region_index",
+            "default": None,
+        },
+        {
+            "name": "brain_region_encoding",
+            "type": str,
+            "doc": (
+                "How to store an in-memory brain_region array: 'text' stores the names of every pixel, 'categorical' "
+                "stores an integer brain_region_index plane and the unique brain_region_names."
+            ),
+            "default": "text",
+        },
+        {
+            "name": "storage",
+            "type": dict,
+            "doc": (
+                "HDF5 storage options (H5DataIO keyword arguments such as 'compression', 'compression_opts', "
+                "'shuffle', and 'chunks') to wrap in-memory or streamed x, y, z, and brain_region_index arrays in "
+                "H5DataIO. 'chunks' defaults to tiles of up to 256 x 256 pixels, or to the recommended chunk shape "
+                "of a data chunk iterator. Only the HDF5 backend uses these options. Defaults to None, which stores "
+                "the arrays as given. Data already wrapped in a DataIO is left unchanged."
+            ),
+            "default": None,
+            "allow_none": True,
+        },
         allow_positional=AllowPositional.ERROR,
     )
     def __init__(self, **kwargs):
@@ -411,28 +1612,326 @@ class AnatomicalCoordinatesImage(TempAnatomicalCoordinatesImage):
         x = kwargs["x"]
         y = kwargs["y"]
         z = kwargs["z"]
-        if x.shape != image.data.shape or y.shape != image.data.shape or z.shape != image.data.shape:
+        matrix = kwargs["pixel_to_space_matrix"]
+        image_shape = _get_data_shape(image.data)
+        if matrix is not None:
+            if x is not None or y is not None or z is not None:
+                raise ValueError('"pixel_to_space_matrix" cannot be provided together with "x", "y", and "z"')
+            matrix = np.asarray(matrix, dtype=np.float64)
+            if matrix.shape != (3, 3):
+                raise ValueError(f'"pixel_to_space_matrix" must be a 3x3 array. Provided shape: {matrix.shape}')
+            kwargs["pixel_to_space_matrix"] = matrix
+        elif x is None or y is None or z is None:
+            raise ValueError('Either "x", "y", and "z" or "pixel_to_space_matrix" must be provided')
+        elif not all(_shapes_match(_get_data_shape(data), image_shape) for data in (x, y, z)):
             raise ValueError(
                 f'"x", "y", and "z" must have the same shape as the image data. '
-                f"x.shape: {x.shape}, y.shape: {y.shape}, z.shape: {z.shape}, "
-                f"image.data.shape: {image.data.shape}"
+                f"x.shape: {_get_data_shape(x)}, y.shape: {_get_data_shape(y)}, z.shape: {_get_data_shape(z)}, "
+                f"image.data.shape: {image_shape}"
             )
+        encoding = kwargs.pop("brain_region_encoding")
+        if encoding not in ("text", "categorical"):
+            raise ValueError(f'"brain_region_encoding" must be "text" or "categorical". Provided: "{encoding}"')
+        if kwargs["brain_region"] is not None and kwargs["brain_region_index"] is not None:
+            raise ValueError('"brain_region" and "brain_region_index" cannot both be provided')
+        if (kwargs["brain_region_index"] is None) != (kwargs["brain_region_names"] is None):
+            raise ValueError('"brain_region_index" and "brain_region_names" must be provided together')
+        if kwargs["brain_region"] is not None and not _shapes_match(
+            _get_data_shape(kwargs["brain_region"]), image_shape
+        ):
+            raise ValueError(
+                f'"brain_region" must have the same shape as the image data. '
+                f"brain_region.shape: {_get_data_shape(kwargs['brain_region'])}, image.data.shape: {image_shape}"
+            )
+        if isinstance(kwargs["brain_region"], AbstractDataChunkIterator):
+            # Text datasets are converted to a list of strings when written, so they cannot be streamed
+            raise ValueError(
+                '"brain_region" cannot be a data chunk iterator. Stream "brain_region_index" with '
+                '"brain_region_names" instead.'
+            )
+        if encoding == "categorical" and kwargs["brain_region"] is not None:
+            names, index = np.unique(np.asarray(kwargs.pop("brain_region")), return_inverse=True)
+            kwargs["brain_region_index"] = index.reshape(image_shape).astype(np.int32)
+            kwargs["brain_region_names"] = names
+        if kwargs["brain_region_index"] is not None and not _shapes_match(
+            _get_data_shape(kwargs["brain_region_index"]), image_shape
+        ):
+            raise ValueError(
+                f'"brain_region_index" must have the same shape as the image data. '
+                f"brain_region_index.shape: {_get_data_shape(kwargs['brain_region_index'])}, "
+                f"image.data.shape: {image_shape}"
+            )
+
+        storage = kwargs.pop("storage")
+        if storage:
+            for key in ("x", "y", "z", "brain_region_index"):
+                kwargs[key] = self._wrap_storage(kwargs.get(key), storage)
         super().__init__(**kwargs)
 
-    def get_coordinates(self, i=None, j=None):
-        """Get the anatomical coordinates at a specific pixel or for the entire image.
+    @staticmethod
+    def _wrap_storage(data, storage: dict):
+        """Wrap an in-memory coordinate array or a data chunk iterator in H5DataIO with the given storage options.
+
+        Iterators are chunked by their recommended chunk shape, so each buffer is written as whole tiles.
+        """
+        if isinstance(data, AbstractDataChunkIterator):
+            chunks = data.recommended_chunk_shape() or True
+        elif isinstance(data, np.ndarray) and data.size:
+            chunks = tuple(min(n, _DEFAULT_COORDINATES_TILE) for n in data.shape)
+        else:
+            return data
+        storage = dict(storage)
+        if storage.get("chunks") is None:
+            storage["chunks"] = chunks
+        return H5DataIO(data, **storage)
+
+    def get_coordinates(self, i=None, j=None, rows=None, cols=None, out=None, mask=None):
+        """Get the anatomical coordinates at specific pixels, for a window of the image, or for the entire image.
+
+        Windows are read by slicing the backing x, y, and z datasets directly, so only the requested pixels are
+        loaded into memory. Batches of pixels are read with a single sorted, deduplicated selection per dataset.
+        If the image stores a ``pixel_to_space_matrix`` instead, the coordinates of the requested pixels are
+        computed on demand.
 
         Args:
-            i (int, optional): The row index of the pixel. Defaults to None.
-            j (int, optional): The column index of the pixel. Defaults to None.
+            i (int or array-like, optional): The row index (or indices) of the pixel(s). Defaults to None.
+            j (int or array-like, optional): The column index (or indices) of the pixel(s). Defaults to None.
+            rows (slice, optional): The rows of the window to read. Defaults to all rows.
+            cols (slice, optional): The columns of the window to read. Defaults to all columns.
+            out (np.ndarray, optional): Preallocated array of shape (n_rows, n_cols, 3) to write the window into.
+                Defaults to None, in which case a new array is allocated.
+            mask (np.ndarray, optional): 2D boolean array with the shape of the image selecting the pixels to read,
+                in row-major order. Defaults to None.
         Returns:
             tuple or np.ndarray: The anatomical coordinates at the specified pixel (i, j) as a tuple,
-            or the entire coordinate arrays stacked along the last axis if i and j are not provided.
+            an array of shape (N, 3) if arrays of pixel indices or a mask are provided,
+            or the coordinate arrays of the window (the entire image by default) stacked along the last axis.
+        """
+        shape = self._get_shape()
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool)
+            if mask.shape != shape:
+                raise ValueError(
+                    f'"mask" must have the same shape as the coordinate arrays. '
+                    f"mask.shape: {mask.shape}, coordinates shape: {shape}"
+                )
+            i, j = np.nonzero(mask)
+        if i is not None and j is not None:
+            if np.ndim(i) == 0 and np.ndim(j) == 0:
+                if self.pixel_to_space_matrix is not None:
+                    return tuple(self._compute_coordinates(i, j))
+                return (self.x[i, j], self.y[i, j], self.z[i, j])
+            return self._get_pixel_coordinates(i, j)
+
+        rows = slice(None) if rows is None else rows
+        cols = slice(None) if cols is None else cols
+        row_range = range(*rows.indices(shape[0]))
+        col_range = range(*cols.indices(shape[1]))
+        if out is None:
+            out = np.empty((len(row_range), len(col_range), 3), dtype=self._get_coordinates_dtype())
+        elif out.shape != (len(row_range), len(col_range), 3):
+            raise ValueError(
+                f'"out" must have shape {(len(row_range), len(col_range), 3)}. Provided shape: {out.shape}'
+            )
+
+        if self.pixel_to_space_matrix is not None:
+            out[...] = self._compute_coordinates(np.asarray(row_range)[:, None], np.asarray(col_range)[None, :])
+            return out
+        for axis, data in enumerate((self.x, self.y, self.z)):
+            out[..., axis] = data[rows, cols]
+        return out
+
+    def _get_shape(self) -> tuple:
+        """Get the (height, width) of the coordinate map."""
+        if self.pixel_to_space_matrix is not None:
+            return tuple(self.image.data.shape[:2])
+        return tuple(self.x.shape)
+
+    def _get_coordinates_dtype(self) -> np.dtype:
+        if self.pixel_to_space_matrix is not None:
+            return np.dtype(np.float64)
+        return np.result_type(self.x.dtype, self.y.dtype, self.z.dtype)
+
+    def _compute_coordinates(self, i, j) -> np.ndarray:
+        """Compute the (x, y, z) coordinates of pixels (i, j) from the pixel_to_space_matrix."""
+        matrix = np.asarray(self.pixel_to_space_matrix)
+        i = np.asarray(i, dtype=np.float64)[..., None]
+        j = np.asarray(j, dtype=np.float64)[..., None]
+        return i * matrix[:, 0] + j * matrix[:, 1] + matrix[:, 2]
+
+    @staticmethod
+    def _read_pixels(data, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Read data[i, j] for arrays of in-bounds pixel indices with contiguous reads.
+
+        For chunked datasets, each run of consecutive bands of chunk rows that contains a requested pixel is read as
+        one slice spanning the columns of the pixels, so every chunk is decompressed at most once. Selecting the
+        rows with fancy indexing instead makes h5py decompress a chunk once per selected row. Unchunked datasets
+        are read with one orthogonal selection of the unique rows. The pixels are then gathered in memory.
         """
+        if isinstance(data, DataIO):
+            data = data.data
+        if isinstance(data, np.ndarray):
+            return data[i, j]
+
+        unique_rows, row_inverse = np.unique(i, return_inverse=True)
+        col_start, col_stop = int(j.min()), int(j.max()) + 1
+        chunks = getattr(data, "chunks", None)
+        if not chunks:
+            block = np.asarray(data[unique_rows, col_start:col_stop])
+            return block[row_inverse, j - col_start]
+
+        band_rows = int(chunks[0])
+        bands = unique_rows // band_rows
+        # Split the touched bands into runs of consecutive bands, each read with a single slice
+        run_starts = np.flatnonzero(np.diff(bands, prepend=bands[0] - 2) > 1)
+        run_stops = np.append(run_starts[1:], bands.size)
+        block = None
+        for start, stop in zip(run_starts, run_stops):
+            row_start = int(bands[start]) * band_rows
+            row_stop = min((int(bands[stop - 1]) + 1) * band_rows, data.shape[0])
+            band = np.asarray(data[row_start:row_stop, col_start:col_stop])
+            if block is None:
+                block = np.empty((unique_rows.size, col_stop - col_start), dtype=band.dtype)
+            block[start:stop] = band[unique_rows[start:stop] - row_start]
+        return block[row_inverse, j - col_start]
+
+    def get_region(self, i=None, j=None):
+        """Get the brain region names at specific pixels or for the entire image.
+
+        Works with both the text ``brain_region`` and the categorical ``brain_region_index`` storage. Batches of
+        pixels are read with one selection, and for the categorical storage only the names of the requested pixels
+        are decoded.
 
-        import numpy as np
+        Args:
+            i (int or array-like, optional): The row index (or indices) of the pixel(s). Defaults to None.
+            j (int or array-like, optional): The column index (or indices) of the pixel(s). Defaults to None.
+        Returns:
+            str or np.ndarray: The brain region name at the pixel (i, j), an array of names for arrays of
+            indices, or the 2D array of names for the entire image if i and j are not provided.
+        """
+        if self.brain_region_index is None:
+            if self.brain_region is None:
+                raise ValueError(f"AnatomicalCoordinatesImage '{self.name}' has no brain region data")
+            if i is None or j is None:
+                return np.asarray(self.brain_region[:])
+            if np.ndim(i) == 0 and np.ndim(j) == 0:
+                return self.brain_region[i, j]
+            i, j = self._normalize_pixels(i, j)
+            return self._read_pixels(self.brain_region, i, j) if i.size else np.empty(0, dtype=object)
+
+        names = np.asarray(self.brain_region_names[:])
+        if i is None or j is None:
+            return names[np.asarray(self.brain_region_index[:])]
+        if np.ndim(i) == 0 and np.ndim(j) == 0:
+            return names[self.brain_region_index[i, j]]
+        i, j = self._normalize_pixels(i, j)
+        return names[self._read_pixels(self.brain_region_index, i, j)] if i.size else names[:0]
+
+    def region_mask(self, name: str) -> np.ndarray:
+        """Get a boolean mask of the pixels that belong to a brain region.
+
+        With the categorical ``brain_region_index`` storage, the mask is computed on the integer plane without
+        decoding any names.
 
-        if i is not None and j is not None:
-            return (self.x[i, j], self.y[i, j], self.z[i, j])
-        else:
-            return np.stack([self.x[:], self.y[:], self.z[:]], axis=-1)
+        Args:
+            name (str): The brain region name.
+        Returns:
+            np.ndarray: 2D boolean array with the shape of the image.
+        """
+        if self.brain_region_index is None:
+            return self.get_region() == name
+        matches = np.flatnonzero(np.asarray(self.brain_region_names[:]) == name)
+        return np.isin(np.asarray(self.brain_region_index[:]), matches)
+
+    def _normalize_pixels(self, i, j):
+        """Flatten arrays of pixel indices, wrapping negative indices and checking bounds."""
+        height, width = self._get_shape()
+        i, j = np.broadcast_arrays(np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64))
+        i = np.where(i < 0, i + height, i).ravel()
+        j = np.where(j < 0, j + width, j).ravel()
+        if np.any((i < 0) | (i >= height)) or np.any((j < 0) | (j >= width)):
+            raise IndexError(f"Pixel indices are out of bounds for coordinate arrays of shape {(height, width)}")
+        return i, j
+
+    def _get_pixel_coordinates(self, i, j):
+        """Get the coordinates of a batch of pixels with one read per backing dataset."""
+        i, j = self._normalize_pixels(i, j)
+        if self.pixel_to_space_matrix is not None:
+            return self._compute_coordinates(i, j)
+
+        out = np.empty((i.size, 3), dtype=self._get_coordinates_dtype())
+        if i.size == 0:
+            return out
+        for axis, data in enumerate((self.x, self.y, self.z)):
+            out[:, axis] = self._read_pixels(data, i, j)
+        return out
+
+    def find_pixels(self, points, max_distance: float = np.inf, stride: int = 1):
+        """Find the pixel whose coordinates are nearest to each of a set of points in the space.
+
+        This is the inverse of :py:meth:`get_coordinates`. The lookup uses a spatial index over the coordinates
+        of every ``stride``-th row and column of the image, built once per ``stride`` and cached. Pixels with
+        non-finite coordinates, such as the NaN pixels outside the registered brain, are left out of the index.
+
+        Args:
+            points (array-like): Array of shape (N, 3) or (3,) of (x, y, z) coordinates in the space of the image.
+            max_distance (float, optional): Maximum distance between a point and its pixel, in the units of the
+                space. Defaults to no limit.
+            stride (int, optional): Subsampling step of the rows and columns included in the index, to bound its
+                memory for large images. Defaults to 1 (every pixel).
+        Returns:
+            tuple: ``(pixels, distances)`` where ``pixels`` is an int array of shape (N, 2) with the (i, j) of the
+            nearest pixel of each point, or (-1, -1) if no pixel lies within ``max_distance``, and ``distances``
+            is an array of shape (N,) with the distance to that pixel (inf if none was found).
+        """
+        if stride <= 0:
+            raise ValueError(f'"stride" must be positive. Provided: {stride}')
+        points = np.asarray(points, dtype=np.float64)
+        if points.shape[-1:] != (3,):
+            raise ValueError(f"points must have shape (N, 3) or (3,). Provided shape: {points.shape}")
+
+        cached = getattr(self, "_pixel_index", None)
+        if cached is None or cached[0] != stride:
+            grid = slice(None, None, stride)
+            coords = self.get_coordinates(rows=grid, cols=grid)
+            cached = (stride, _GridIndex(coords.reshape(-1, 3)), coords.shape[1])
+            self._pixel_index = cached
+        _, index, n_cols = cached
+
+        flat_points = points.reshape(-1, 3)
+        pixels = np.full((len(flat_points), 2), -1, dtype=np.int64)
+        distances = np.full(len(flat_points), np.inf)
+        for n, point in enumerate(flat_points):
+            if np.isfinite(max_distance):
+                found, found_distances = index.query_radius(point, max_distance)
+            else:
+                found, found_distances = index.query_nearest(point, 1)
+            if len(found):
+                pixels[n] = np.array(divmod(int(found[0]), n_cols)) * stride
+                distances[n] = found_distances[0]
+        return pixels.reshape(points.shape[:-1] + (2,)), distances.reshape(points.shape[:-1])
+
+    def iter_tiles(self, tile_shape):
+        """Iterate over the anatomical coordinates of the image in tiles.
+
+        A single buffer of ``tile_shape`` is allocated and reused for every tile, so memory stays bounded by the
+        tile size. Copy the yielded array if it needs to outlive the iteration step.
+
+        Args:
+            tile_shape (tuple of int): The (n_rows, n_cols) shape of each tile. Tiles on the bottom and right
+                edges of the image may be smaller.
+        Yields:
+            tuple: ``(rows, cols, coordinates)`` where ``rows`` and ``cols`` are the slices of the tile in the
+            image and ``coordinates`` is an array of shape (tile_rows, tile_cols, 3).
+        """
+        tile_rows, tile_cols = tile_shape
+        if tile_rows <= 0 or tile_cols <= 0:
+            raise ValueError(f'"tile_shape" must contain positive values. Provided: {tuple(tile_shape)}')
+        height, width = self._get_shape()
+        buffer = np.empty((tile_rows, tile_cols, 3), dtype=self._get_coordinates_dtype())
+        for row_start in range(0, height, tile_rows):
+            rows = slice(row_start, min(row_start + tile_rows, height))
+            for col_start in range(0, width, tile_cols):
+                cols = slice(col_start, min(col_start + tile_cols, width))
+                out = buffer[: rows.stop - rows.start, : cols.stop - cols.start]
+                yield rows, cols, self.get_coordinates(rows=rows, cols=cols, out=out)
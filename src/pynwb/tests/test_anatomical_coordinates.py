@@ -1,13 +1,18 @@
 """Unit and integration tests for the new neurodata type."""
 
+import itertools
+import zipfile
+
 import numpy as np
 import numpy.testing as npt
+import pandas as pd
 import pytest
+from hdmf.data_utils import DataChunkIterator, GenericDataChunkIterator
 from pynwb.base import Images
 from pynwb.image import GrayscaleImage
 from pynwb.testing.mock.ecephys import mock_ElectrodeTable
 from pynwb.testing.mock.file import mock_NWBFile
-from pynwb.testing.mock.ophys import mock_ImagingPlane
+from pynwb.testing.mock.ophys import mock_ImagingPlane, mock_OnePhotonSeries, mock_TwoPhotonSeries
 
 from ndx_anatomical_localization import (
     AffineTransformation,
@@ -23,8 +28,13 @@ from ndx_anatomical_localization import (
     NMTv2AsymmetricSpace,
     NMTv2Space,
     Space,
+    build_catalog,
+    get_atlas_volume,
+    read_catalog,
+    read_localization_summary,
+    set_atlas_directory,
 )
-from pynwb import NWBHDF5IO, read_nwb
+from pynwb import NWBHDF5IO, H5DataIO, read_nwb
 
 
 def test_create_custom_space():
@@ -838,6 +848,10 @@ def test_brain_region_masks_to_image():
     assert img[21, 10] == 2
     assert img[0, 0] == 0  # background pixel
 
+    # Each call returns a new array that can be edited without affecting the cache
+    img[20, 10] = 5
+    assert masks._to_image(image_height=30, image_width=20)[20, 10] == 1
+
 
 def test_brain_region_masks_write_read(tmp_path):
     nwbfile = mock_NWBFile()
@@ -1013,3 +1027,1597 @@ def test_brain_region_masks_directly_under_localization(tmp_path):
             read_masks["brain_region_id"].data[:],
             np.array([385, 385, 394], dtype=np.uint32),
         )
+
+
+# ---------------------------------------------------------------------------
+# Space conversion
+# ---------------------------------------------------------------------------
+
+
+def test_space_transform_to_ras_mm():
+    ccf = AllenCCFv3Space()
+    ras = Space(name="RAS", space_name="RAS", origin="bregma", units="mm", orientation="RAS")
+
+    # PIR um -> RAS mm: x_R = z_R, y_A = -x_P, z_S = -y_I
+    coords = np.array([[1000.0, 2000.0, 3000.0], [0.0, 500.0, -250.0]])
+    expected = np.array([[3.0, -1.0, -2.0], [-0.25, 0.0, -0.5]])
+    npt.assert_array_almost_equal(ccf.transform_to(ras, coords), expected)
+
+    # The inverse conversion recovers the original coordinates
+    npt.assert_array_almost_equal(ras.transform_to(ccf, expected), coords)
+
+    # A single point keeps its shape
+    npt.assert_array_almost_equal(ccf.transform_to(ras, coords[0]), expected[0])
+
+
+def test_space_transform_matrix_is_cached():
+    ccf = AllenCCFv3Space()
+    d99 = D99v2Space()
+    assert ccf.get_transform_matrix(d99) is AllenCCFv3Space().get_transform_matrix(D99v2Space())
+    npt.assert_array_equal(d99.get_transform_matrix(NMTv2Space()), np.eye(4))
+
+
+def test_space_transform_to_invalid():
+    ccf = AllenCCFv3Space()
+    space = Space(name="MySpace", space_name="MySpace", origin="bregma", units="furlongs", orientation="RAS")
+    with pytest.raises(ValueError, match="Cannot convert coordinates in units 'furlongs'"):
+        ccf.transform_to(space, np.zeros((1, 3)))
+    with pytest.raises(ValueError, match=r"coords must have shape \(N, 3\) or \(3,\)"):
+        ccf.transform_to(D99v2Space(), np.zeros((4, 2)))
+
+
+def test_anatomical_coordinates_table_to_space():
+    nwbfile = mock_NWBFile()
+    electrodes_table = mock_ElectrodeTable(nwbfile=nwbfile)
+
+    table = AnatomicalCoordinatesTable(
+        name="MyAnatomicalLocalization",
+        target=electrodes_table,
+        description="Anatomical coordinates table",
+        method="method",
+        space=AllenCCFv3Space(),
+    )
+    for i in range(5):
+        table.add_row(x=100.0 * i, y=200.0, z=300.0, localized_entity=i)
+
+    ras = Space(name="RAS", space_name="RAS", origin="bregma", units="mm", orientation="RAS")
+    coords = table.to_space(ras)
+    assert coords.shape == (5, 3)
+    npt.assert_array_almost_equal(coords[:, 0], np.full(5, 0.3))
+    npt.assert_array_almost_equal(coords[:, 1], -0.1 * np.arange(5))
+    npt.assert_array_almost_equal(coords[:, 2], np.full(5, -0.2))
+
+
+# ---------------------------------------------------------------------------
+# AnatomicalCoordinatesImage windowed access
+# ---------------------------------------------------------------------------
+
+
+def _make_coordinates_image(shape=(6, 7)):
+    x_data = np.arange(np.prod(shape), dtype=np.float32).reshape(shape)
+    image = GrayscaleImage(name="MeanImage", data=np.ones(shape), description="mean image")
+    space = Space(name="MySpace", space_name="MySpace", origin="bregma", units="um", orientation="RAS")
+    return AnatomicalCoordinatesImage(
+        name="TestCoordinates",
+        image=image,
+        method="test_method",
+        space=space,
+        x=x_data,
+        y=x_data + 100.0,
+        z=x_data + 200.0,
+    )
+
+
+def test_get_coordinates_window():
+    coords = _make_coordinates_image()
+    expected = coords.get_coordinates()
+
+    window = coords.get_coordinates(rows=slice(1, 4), cols=slice(2, 7, 2))
+    npt.assert_array_equal(window, expected[1:4, 2:7:2])
+
+    out = np.zeros((2, 7, 3), dtype=np.float32)
+    result = coords.get_coordinates(rows=slice(4, None), out=out)
+    assert result is out
+    npt.assert_array_equal(out, expected[4:])
+
+    with pytest.raises(ValueError, match=r'"out" must have shape \(2, 7, 3\)'):
+        coords.get_coordinates(rows=slice(4, None), out=np.zeros((2, 2, 3)))
+
+
+def test_get_coordinates_window_write_read(tmp_path):
+    nwbfile = mock_NWBFile()
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+
+    coords = _make_coordinates_image()
+    nwbfile.create_processing_module("ophys", "ophys")
+    nwbfile.processing["ophys"].add(Images(name="SummaryImages", description="summary", images=[coords.image]))
+    localization.add_spaces([coords.space])
+    localization.add_anatomical_coordinates_images([coords])
+    expected = coords.get_coordinates()
+
+    with NWBHDF5IO(tmp_path / "test_window.nwb", "w") as io:
+        io.write(nwbfile)
+
+    with NWBHDF5IO(tmp_path / "test_window.nwb", "r", load_namespaces=True) as io:
+        read_coords = io.read().lab_meta_data["localization"].anatomical_coordinates_images["TestCoordinates"]
+        npt.assert_array_equal(read_coords.get_coordinates(rows=slice(2, 5), cols=slice(0, 3)), expected[2:5, 0:3])
+
+
+def test_iter_tiles():
+    coords = _make_coordinates_image()
+    expected = coords.get_coordinates()
+
+    reconstructed = np.full_like(expected, np.nan)
+    n_tiles = 0
+    for rows, cols, tile in coords.iter_tiles((4, 3)):
+        assert tile.shape[:2] == (rows.stop - rows.start, cols.stop - cols.start)
+        reconstructed[rows, cols] = tile
+        n_tiles += 1
+
+    assert n_tiles == 6
+    npt.assert_array_equal(reconstructed, expected)
+
+    with pytest.raises(ValueError, match='"tile_shape" must contain positive values'):
+        next(coords.iter_tiles((0, 3)))
+
+
+def test_get_coordinates_batch():
+    coords = _make_coordinates_image()
+    expected = coords.get_coordinates()
+
+    i = np.array([5, 0, 2, 2, -1])
+    j = np.array([1, 6, 3, 3, 0])
+    npt.assert_array_equal(coords.get_coordinates(i=i, j=j), expected[i, j])
+
+    mask = np.zeros((6, 7), dtype=bool)
+    mask[1, 2] = mask[4, 5] = mask[4, 0] = True
+    npt.assert_array_equal(coords.get_coordinates(mask=mask), expected[mask])
+
+    assert coords.get_coordinates(i=[], j=[]).shape == (0, 3)
+
+    with pytest.raises(IndexError, match="Pixel indices are out of bounds"):
+        coords.get_coordinates(i=[0, 6], j=[0, 0])
+    with pytest.raises(ValueError, match='"mask" must have the same shape as the coordinate arrays'):
+        coords.get_coordinates(mask=np.ones((2, 2), dtype=bool))
+
+
+def test_get_coordinates_batch_write_read(tmp_path):
+    nwbfile = mock_NWBFile()
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+
+    coords = _make_coordinates_image()
+    nwbfile.create_processing_module("ophys", "ophys")
+    nwbfile.processing["ophys"].add(Images(name="SummaryImages", description="summary", images=[coords.image]))
+    localization.add_spaces([coords.space])
+    localization.add_anatomical_coordinates_images([coords])
+    expected = coords.get_coordinates()
+
+    with NWBHDF5IO(tmp_path / "test_batch.nwb", "w") as io:
+        io.write(nwbfile)
+
+    i = np.array([3, 1, 3, 0, 5])
+    j = np.array([6, 2, 0, 0, 4])
+    with NWBHDF5IO(tmp_path / "test_batch.nwb", "r", load_namespaces=True) as io:
+        read_coords = io.read().lab_meta_data["localization"].anatomical_coordinates_images["TestCoordinates"]
+        npt.assert_array_equal(read_coords.get_coordinates(i=i, j=j), expected[i, j])
+
+
+# ---------------------------------------------------------------------------
+# BrainRegionMasks reconstruction
+# ---------------------------------------------------------------------------
+
+
+def test_brain_region_masks_to_image_smallest_dtype():
+    masks = BrainRegionMasks(name="masks", description="pixel masks")
+    masks.add_row(x=10, y=20, brain_region_id=1)
+    masks.add_row(x=11, y=20, brain_region_id=200)
+    img = masks.to_image((30, 20))
+    assert img.dtype == np.uint8
+    assert img[20, 11] == 200
+
+    masks.add_row(x=0, y=0, brain_region_id=385)
+    img = masks.to_image((30, 20))
+    assert img.dtype == np.uint16
+    assert img[0, 0] == 385
+
+    assert masks.to_image((30, 20), dtype=np.int64).dtype == np.int64
+
+
+def test_brain_region_masks_to_image_cached():
+    masks = BrainRegionMasks(name="masks", description="pixel masks")
+    masks.add_row(x=1, y=2, brain_region_id=7)
+
+    img = masks.to_image((4, 4))
+    assert masks.to_image((4, 4)) is img
+    assert not img.flags.writeable
+
+    # Adding a row invalidates the cache
+    masks.add_row(x=3, y=3, brain_region_id=8)
+    new_img = masks.to_image((4, 4))
+    assert new_img is not img
+    assert new_img[3, 3] == 8
+
+
+def test_brain_region_masks_to_image_out():
+    masks = BrainRegionMasks(name="masks", description="pixel masks")
+    masks.add_row(x=1, y=2, brain_region_id=7)
+
+    out = np.full((4, 4), 99, dtype=np.int32)
+    result = masks.to_image((4, 4), out=out)
+    assert result is out
+    expected = np.zeros((4, 4), dtype=np.int32)
+    expected[2, 1] = 7
+    npt.assert_array_equal(out, expected)
+
+    with pytest.raises(ValueError, match=r'"out" must have shape \(4, 4\)'):
+        masks.to_image((4, 4), out=np.zeros((3, 3), dtype=np.int32))
+
+
+# ---------------------------------------------------------------------------
+# BrainRegionMasks trace extraction
+# ---------------------------------------------------------------------------
+
+
+def _make_region_masks():
+    masks = BrainRegionMasks(name="masks", description="pixel masks")
+    for x, y, region in [(1, 1, 385), (2, 1, 385), (1, 2, 385), (4, 3, 394), (0, 5, 7)]:
+        masks.add_row(x=x, y=y, brain_region_id=region)
+    return masks
+
+
+def _expected_traces(data, masks, reducer):
+    image = masks.to_image(data.shape[1:])
+    return np.stack([reducer(data[:, image == region], axis=1) for region in (7, 385, 394)], axis=1)
+
+
+def test_brain_region_masks_extract_traces():
+    rng = np.random.default_rng(0)
+    data = rng.random((25, 6, 5)).astype(np.float32)
+    series = mock_OnePhotonSeries(data=data)
+    masks = _make_region_masks()
+
+    region_ids, traces = masks.extract_traces(series, chunk_frames=7)
+    npt.assert_array_equal(region_ids, [7, 385, 394])
+    assert traces.shape == (25, 3)
+    npt.assert_array_almost_equal(traces, _expected_traces(data, masks, np.mean))
+
+    for reducer, func in [("sum", np.sum), ("max", np.max), ("min", np.min)]:
+        _, traces = masks.extract_traces(series, reducer=reducer)
+        npt.assert_array_almost_equal(traces, _expected_traces(data, masks, func))
+
+
+def test_brain_region_masks_extract_traces_invalid():
+    masks = _make_region_masks()
+    series = mock_TwoPhotonSeries(data=np.ones((3, 6, 5)))
+    with pytest.raises(ValueError, match='"reducer" must be one of'):
+        masks.extract_traces(series, reducer="median")
+    with pytest.raises(ValueError, match="Mask pixels are out of bounds for frames of shape \\(4, 4\\)"):
+        masks.extract_traces(mock_TwoPhotonSeries(data=np.ones((3, 4, 4))))
+
+
+def test_brain_region_masks_extract_traces_write_read(tmp_path):
+    rng = np.random.default_rng(1)
+    data = rng.random((12, 6, 5)).astype(np.float32)
+
+    nwbfile = mock_NWBFile()
+    mock_TwoPhotonSeries(name="TwoPhotonSeries", data=data, nwbfile=nwbfile)
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    localization.add_brain_region_masks([_make_region_masks()])
+
+    with NWBHDF5IO(tmp_path / "test_traces.nwb", "w") as io:
+        io.write(nwbfile)
+
+    with NWBHDF5IO(tmp_path / "test_traces.nwb", "r", load_namespaces=True) as io:
+        read_nwbfile = io.read()
+        read_masks = read_nwbfile.lab_meta_data["localization"].brain_region_masks["masks"]
+        _, traces = read_masks.extract_traces(read_nwbfile.acquisition["TwoPhotonSeries"], chunk_frames=5)
+        npt.assert_array_almost_equal(traces, _expected_traces(data, read_masks, np.mean))
+
+
+# ---------------------------------------------------------------------------
+# BrainRegionMasks run-length encoding
+# ---------------------------------------------------------------------------
+
+
+def _make_label_image():
+    label_image = np.zeros((6, 8), dtype=np.int32)
+    label_image[1:4, 2:7] = 385
+    label_image[2, 4:6] = 394
+    label_image[5, :] = 7
+    return label_image
+
+
+@pytest.mark.parametrize("encoding", ["rle", "pixel"])
+def test_brain_region_masks_from_label_image(encoding):
+    label_image = _make_label_image()
+    masks = BrainRegionMasks.from_label_image(
+        name="masks", description="pixel masks", label_image=label_image, encoding=encoding
+    )
+
+    npt.assert_array_equal(masks.to_image(label_image.shape), label_image)
+    if encoding == "rle":
+        assert "run_length" in masks.colnames
+        # rows 1 and 3: one run each; row 2: three runs; row 5: one run
+        assert len(masks) == 6
+        assert masks["run_length"].data.dtype == np.int32
+    else:
+        assert "run_length" not in masks.colnames
+        assert len(masks) == np.count_nonzero(label_image)
+
+
+def test_brain_region_masks_from_label_image_invalid():
+    with pytest.raises(ValueError, match='"encoding" must be "rle" or "pixel"'):
+        BrainRegionMasks.from_label_image(name="masks", description="d", label_image=np.zeros((2, 2)), encoding="csr")
+    with pytest.raises(ValueError, match="label_image must be a 2D array"):
+        BrainRegionMasks.from_label_image(name="masks", description="d", label_image=np.zeros(4))
+
+
+def test_brain_region_masks_rle_write_read(tmp_path):
+    label_image = _make_label_image()
+    nwbfile = mock_NWBFile()
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    localization.add_brain_region_masks(
+        [BrainRegionMasks.from_label_image(name="masks", description="pixel masks", label_image=label_image)]
+    )
+
+    with NWBHDF5IO(tmp_path / "test_rle.nwb", "w") as io:
+        io.write(nwbfile)
+
+    data = np.random.default_rng(2).random((4,) + label_image.shape)
+    with NWBHDF5IO(tmp_path / "test_rle.nwb", "r", load_namespaces=True) as io:
+        read_masks = io.read().lab_meta_data["localization"].brain_region_masks["masks"]
+        assert len(read_masks) == 6
+        npt.assert_array_equal(read_masks.to_image(label_image.shape), label_image)
+
+        region_ids, traces = read_masks.extract_traces(mock_OnePhotonSeries(data=data))
+        npt.assert_array_equal(region_ids, [7, 385, 394])
+        npt.assert_array_almost_equal(traces[:, 1], data[:, label_image == 385].mean(axis=1))
+
+
+# ---------------------------------------------------------------------------
+# AnatomicalCoordinatesTable spatial queries
+# ---------------------------------------------------------------------------
+
+
+def _make_coordinates_table(coords):
+    nwbfile = mock_NWBFile()
+    electrodes_table = mock_ElectrodeTable(nwbfile=nwbfile, n_rows=len(coords))
+    table = AnatomicalCoordinatesTable(
+        name="MyAnatomicalLocalization",
+        target=electrodes_table,
+        description="Anatomical coordinates table",
+        method="method",
+        space=AllenCCFv3Space(),
+    )
+    for i, (x, y, z) in enumerate(coords):
+        table.add_row(x=x, y=y, z=z, localized_entity=len(coords) - 1 - i)
+    return table
+
+
+def test_anatomical_coordinates_table_spatial_queries():
+    rng = np.random.default_rng(3)
+    coords = rng.uniform(0, 1000, size=(500, 3))
+    table = _make_coordinates_table(coords)
+    point = np.array([500.0, 400.0, 600.0])
+    distances = np.linalg.norm(coords - point, axis=1)
+
+    rows, entities = table.query_radius(point, 200.0)
+    npt.assert_array_equal(rows, np.argsort(distances)[: np.count_nonzero(distances <= 200.0)])
+    npt.assert_array_equal(entities, 499 - rows)
+
+    rows, entities = table.query_nearest(point, k=5)
+    npt.assert_array_equal(rows, np.argsort(distances)[:5])
+    npt.assert_array_equal(entities, 499 - rows)
+
+    lower, upper = np.array([100.0, 200.0, 300.0]), np.array([400.0, 500.0, 900.0])
+    rows, _ = table.query_box(lower, upper)
+    npt.assert_array_equal(rows, np.flatnonzero(np.all((coords >= lower) & (coords <= upper), axis=1)))
+
+    # Far-away queries and k larger than the table
+    assert len(table.query_radius([5000.0, 5000.0, 5000.0], 10.0)[0]) == 0
+    assert len(table.query_nearest([5000.0, 5000.0, 5000.0], k=600)[0]) == 500
+
+
+def test_anatomical_coordinates_table_spatial_queries_skip_nan():
+    coords = np.array([[0.0, 0.0, 0.0], [np.nan, np.nan, np.nan], [10.0, 10.0, 10.0], [9.0, 9.0, np.nan]])
+    table = _make_coordinates_table(coords)
+
+    rows, entities = table.query_radius([9.0, 9.0, 9.0], 5.0)
+    npt.assert_array_equal(rows, [2])
+    npt.assert_array_equal(entities, [1])
+    rows, _ = table.query_nearest([9.0, 9.0, 9.0], k=4)
+    npt.assert_array_equal(rows, [2, 0])
+    rows, _ = table.query_box([-1.0, -1.0, -1.0], [11.0, 11.0, 11.0])
+    npt.assert_array_equal(rows, [0, 2])
+
+
+def test_anatomical_coordinates_table_spatial_index_rebuilt_on_add_row():
+    table = _make_coordinates_table(np.array([[0.0, 0.0, 0.0], [10.0, 10.0, 10.0]]))
+    rows, _ = table.query_nearest([9.0, 9.0, 9.0])
+    npt.assert_array_equal(rows, [1])
+
+    table.add_row(x=8.0, y=8.0, z=8.5, localized_entity=0)
+    rows, entities = table.query_nearest([9.0, 9.0, 9.0])
+    npt.assert_array_equal(rows, [2])
+    npt.assert_array_equal(entities, [0])
+
+
+# ---------------------------------------------------------------------------
+# AnatomicalCoordinatesTable region annotation
+# ---------------------------------------------------------------------------
+
+
+def _make_label_volume():
+    label_volume = np.zeros((10, 8, 6), dtype=np.uint32)
+    label_volume[:5] = 385
+    label_volume[5:, :, 3:] = 394
+    return label_volume
+
+
+@pytest.mark.filterwarnings("error::RuntimeWarning")
+def test_anatomical_coordinates_table_annotate_regions():
+    coords = np.array(
+        [
+            [15.0, 5.0, 5.0],
+            [75.0, 35.0, 45.0],
+            [75.0, 35.0, 5.0],
+            [500.0, 0.0, 0.0],
+            [-1.0, 0.0, 0.0],
+            [15.0, 5.0, np.nan],  # not localized
+        ]
+    )
+    table = _make_coordinates_table(coords)
+
+    region_ids = table.annotate_regions(
+        _make_label_volume(), resolution=10.0, ontology={385: "VISp", 394: "VISam"}, id_column="brain_region_id"
+    )
+    npt.assert_array_equal(region_ids, [385, 394, 0, 0, 0, 0])
+    assert table["brain_region"].data == ["VISp", "VISam", "", "", "", ""]
+    assert table["brain_region_id"].data == [385, 394, 0, 0, 0, 0]
+
+    # Existing columns are overwritten in place
+    table.annotate_regions(_make_label_volume(), resolution=[20.0, 10.0, 10.0], ontology={385: "VISp"})
+    assert table["brain_region"].data == ["VISp", "VISp", "VISp", "", "", ""]
+
+
+def test_anatomical_coordinates_table_annotate_regions_memmap(tmp_path):
+    np.save(tmp_path / "annotation.npy", _make_label_volume())
+    table = _make_coordinates_table(np.array([[15.0, 5.0, 5.0], [75.0, 35.0, 45.0]]))
+
+    region_ids = table.annotate_regions(tmp_path / "annotation.npy", resolution=10.0)
+    npt.assert_array_equal(region_ids, [385, 394])
+    assert "brain_region" not in table.colnames
+
+    with pytest.raises(ValueError, match="label_volume must be a 3D array"):
+        table.annotate_regions(np.zeros((4, 4)), resolution=10.0)
+    with pytest.raises(ValueError, match="resolution values must be positive"):
+        table.annotate_regions(_make_label_volume(), resolution=0.0)
+
+
+def test_anatomical_coordinates_table_annotate_regions_write_read(tmp_path):
+    nwbfile = mock_NWBFile()
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    electrodes_table = mock_ElectrodeTable(nwbfile=nwbfile)
+    space = AllenCCFv3Space()
+    localization.add_spaces([space])
+
+    table = AnatomicalCoordinatesTable(
+        name="MyAnatomicalLocalization",
+        target=electrodes_table,
+        description="Anatomical coordinates table",
+        method="method",
+        space=space,
+    )
+    table.add_row(x=15.0, y=5.0, z=5.0, localized_entity=0)
+    table.add_row(x=75.0, y=35.0, z=45.0, localized_entity=1)
+    table.annotate_regions(_make_label_volume(), resolution=10.0, ontology={385: "VISp", 394: "VISam"})
+    localization.add_anatomical_coordinates_tables([table])
+
+    with NWBHDF5IO(tmp_path / "test_annotate.nwb", "w") as io:
+        io.write(nwbfile)
+
+    with NWBHDF5IO(tmp_path / "test_annotate.nwb", "r", load_namespaces=True) as io:
+        read_table = io.read().lab_meta_data["localization"].anatomical_coordinates_tables["MyAnatomicalLocalization"]
+        npt.assert_array_equal(read_table["brain_region"].data[:], np.array(["VISp", "VISam"]))
+
+
+# ---------------------------------------------------------------------------
+# Atlas volume registry
+# ---------------------------------------------------------------------------
+
+
+def test_get_atlas_volume(tmp_path):
+    (tmp_path / "AllenCCFv3").mkdir()
+    np.save(tmp_path / "AllenCCFv3" / "annotation_10.npy", _make_label_volume())
+    set_atlas_directory(tmp_path)
+    try:
+        volume = get_atlas_volume(AllenCCFv3Space, resolution=10)
+        assert isinstance(volume, np.memmap)
+        assert not volume.flags.writeable
+        npt.assert_array_equal(volume, _make_label_volume())
+
+        # Instances and classes share the same cached volume
+        assert get_atlas_volume(AllenCCFv3Space(), resolution=10.0) is volume
+
+        table = _make_coordinates_table(np.array([[15.0, 5.0, 5.0], [75.0, 35.0, 45.0]]))
+        npt.assert_array_equal(table.annotate_regions(volume, resolution=10.0), [385, 394])
+
+        with pytest.raises(FileNotFoundError, match="Atlas volume not found"):
+            get_atlas_volume(AllenCCFv3Space, resolution=25)
+        with pytest.raises(ValueError, match="Space is not a canonical space"):
+            get_atlas_volume(Space(name="s", space_name="s", origin="o", units="mm", orientation="RAS"), 10)
+    finally:
+        set_atlas_directory(None)
+
+
+def test_get_atlas_volume_from_environment(tmp_path, monkeypatch):
+    (tmp_path / "D99v2").mkdir()
+    np.save(tmp_path / "D99v2" / "template_0.25.npy", np.ones((2, 2, 2), dtype=np.float32))
+    monkeypatch.setenv("NDX_ANATOMICAL_LOCALIZATION_ATLAS_DIR", str(tmp_path))
+    npt.assert_array_equal(get_atlas_volume(D99v2Space, resolution=0.25, kind="template"), np.ones((2, 2, 2)))
+
+    monkeypatch.delenv("NDX_ANATOMICAL_LOCALIZATION_ATLAS_DIR")
+    with pytest.raises(ValueError, match="No atlas directory is configured"):
+        get_atlas_volume(D99v2Space, resolution=0.25)
+
+
+# ---------------------------------------------------------------------------
+# AffineTransformation operations
+# ---------------------------------------------------------------------------
+
+
+def test_affine_transformation_apply_inverse_compose():
+    matrix = np.array([[0.99, -0.14, 50.0], [0.14, 0.99, 30.0], [0.0, 0.0, 1.0]])
+    affine = AffineTransformation(name="affine_transformation", affine_matrix=matrix)
+    points = np.array([[0.0, 0.0], [10.0, 20.0], [-5.0, 3.0]])
+
+    expected = (matrix @ np.column_stack([points, np.ones(3)]).T).T[:, :2]
+    npt.assert_array_almost_equal(affine.apply(points), expected)
+    npt.assert_array_almost_equal(affine.apply(points[1]), expected[1])
+
+    inverse = affine.inverse()
+    assert affine.inverse() is inverse
+    npt.assert_array_almost_equal(inverse.apply(affine.apply(points)), points)
+
+    translation = AffineTransformation(name="translation", affine_matrix=[[1, 0, 5], [0, 1, -5], [0, 0, 1]])
+    composed = affine.compose(translation)
+    assert composed.name == "affine_transformation_translation"
+    npt.assert_array_almost_equal(composed.apply(points), expected + [5.0, -5.0])
+
+    with pytest.raises(ValueError, match=r"points must have shape \(N, 2\) or \(2,\)"):
+        affine.apply(np.zeros((3, 3)))
+
+
+def test_affine_transformation_warp_image():
+    image = np.arange(20, dtype=np.float64).reshape(4, 5)
+    shift = AffineTransformation(name="shift", affine_matrix=[[1, 0, 1], [0, 1, 2], [0, 0, 1]])
+
+    warped = shift.warp_image(image, output_shape=(6, 7), order=0, fill_value=-1, tile_rows=2)
+    expected = np.full((6, 7), -1.0)
+    expected[2:6, 1:6] = image
+    npt.assert_array_equal(warped, expected)
+    npt.assert_array_almost_equal(shift.warp_image(image, output_shape=(6, 7), fill_value=-1), expected)
+
+    # Bilinear interpolation halfway between pixels of a linear ramp, with channels
+    half = AffineTransformation(name="half", affine_matrix=[[1, 0, -0.5], [0, 1, 0], [0, 0, 1]])
+    rgb = np.stack([image, 2 * image, 3 * image], axis=-1)
+    warped = half.warp_image(rgb, output_shape=(4, 4))
+    assert warped.shape == (4, 4, 3)
+    npt.assert_array_almost_equal(warped[..., 1], 2 * (image[:, :4] + 0.5))
+
+    with pytest.raises(ValueError, match='"order" must be 0 \\(nearest\\) or 1 \\(bilinear\\)'):
+        shift.warp_image(image, output_shape=(4, 5), order=3)
+
+
+def _make_fit_landmarks(matrix, n=20, n_outliers=0, seed=4):
+    rng = np.random.default_rng(seed)
+    source = rng.uniform(0, 500, size=(n, 2))
+    reference = source @ matrix[:2, :2].T + matrix[:2, 2]
+    reference[:n_outliers] += rng.uniform(100, 200, size=(n_outliers, 2))
+    landmarks = Landmarks(name="landmarks", description="landmark correspondences")
+    for (sx, sy), (rx, ry) in zip(source, reference):
+        landmarks.add_row(source_x=sx, source_y=sy, reference_x=rx, reference_y=ry, confidence=1.0)
+    return landmarks
+
+
+def test_affine_transformation_from_landmarks():
+    matrix = np.array([[1.2, -0.1, 40.0], [0.2, 0.9, -15.0], [0.0, 0.0, 1.0]])
+    landmarks = _make_fit_landmarks(matrix)
+
+    affine = AffineTransformation.from_landmarks(landmarks)
+    assert affine.name == "affine_transformation"
+    npt.assert_array_almost_equal(affine.affine_matrix, matrix, decimal=3)
+    assert np.all(affine.residuals(landmarks) < 1e-2)
+
+
+def test_affine_transformation_from_landmarks_ransac():
+    matrix = np.array([[1.2, -0.1, 40.0], [0.2, 0.9, -15.0], [0.0, 0.0, 1.0]])
+    landmarks = _make_fit_landmarks(matrix, n=30, n_outliers=6)
+
+    plain = AffineTransformation.from_landmarks(landmarks)
+    assert np.abs(plain.affine_matrix - matrix).max() > 1.0
+
+    robust = AffineTransformation.from_landmarks(landmarks, robust="ransac", n_hypotheses=200)
+    npt.assert_array_almost_equal(robust.affine_matrix, matrix, decimal=3)
+    residuals = robust.residuals(landmarks)
+    assert np.all(residuals[6:] < 1e-2)
+    assert np.all(residuals[:6] > 100)
+
+    # Deterministic for a given seed
+    again = AffineTransformation.from_landmarks(landmarks, robust="ransac", n_hypotheses=200)
+    npt.assert_array_equal(again.affine_matrix, robust.affine_matrix)
+
+
+def test_affine_transformation_from_landmarks_weighted():
+    matrix = np.array([[1.0, 0.0, 10.0], [0.0, 1.0, 20.0], [0.0, 0.0, 1.0]])
+    landmarks = _make_fit_landmarks(matrix, n=4, n_outliers=1)
+    landmarks["confidence"].data[0] = 0.0
+
+    npt.assert_array_almost_equal(AffineTransformation.from_landmarks(landmarks).affine_matrix, matrix, decimal=3)
+    unweighted = AffineTransformation.from_landmarks(landmarks, weighted=False)
+    assert np.abs(unweighted.affine_matrix - matrix).max() > 1.0
+
+
+def test_affine_transformation_from_landmarks_invalid():
+    landmarks = Landmarks(name="landmarks", description="test landmarks")
+    landmarks.add_row(source_x=10.0, source_y=20.0)
+    with pytest.raises(ValueError, match=r"Landmarks must have \['reference_x', 'reference_y'\] columns"):
+        AffineTransformation.from_landmarks(landmarks)
+
+    landmarks = _make_fit_landmarks(np.eye(3), n=2)
+    with pytest.raises(ValueError, match="At least 3 landmarks are required"):
+        AffineTransformation.from_landmarks(landmarks)
+    with pytest.raises(ValueError, match='"robust" must be None or "ransac"'):
+        AffineTransformation.from_landmarks(landmarks, robust="lmeds")
+
+
+# ---------------------------------------------------------------------------
+# AtlasRegistration coordinates image
+# ---------------------------------------------------------------------------
+
+
+def test_atlas_registration_to_coordinates_image():
+    matrix = np.array([[0.99, -0.14, 50.0], [0.14, 0.99, 30.0], [0.0, 0.0, 1.0]])
+    source_image = GrayscaleImage(name="SourceImage", data=np.ones((7, 9)), description="source FOV")
+    registration = AtlasRegistration(
+        source_image=source_image,
+        affine_transformation=AffineTransformation(name="affine_transformation", affine_matrix=matrix),
+    )
+    space = AllenCCFv3Space()
+
+    coords_image = registration.to_coordinates_image(space, z_plane=1500.0, block_rows=3)
+    assert isinstance(coords_image, AnatomicalCoordinatesImage)
+    assert coords_image.image is source_image
+    assert coords_image.space is space
+    assert coords_image.x.dtype == np.float32
+
+    rows, cols = np.mgrid[0:7, 0:9]
+    npt.assert_array_almost_equal(coords_image.x, matrix[0, 0] * cols + matrix[0, 1] * rows + matrix[0, 2], decimal=4)
+    npt.assert_array_almost_equal(coords_image.y, matrix[1, 0] * cols + matrix[1, 1] * rows + matrix[1, 2], decimal=4)
+    npt.assert_array_equal(coords_image.z, np.full((7, 9), 1500.0, dtype=np.float32))
+
+
+def test_atlas_registration_to_coordinates_image_without_affine():
+    registration = AtlasRegistration(
+        source_image=GrayscaleImage(name="SourceImage", data=np.ones((5, 5)), description="s")
+    )
+    with pytest.raises(ValueError, match="AtlasRegistration must have an 'affine_transformation'"):
+        registration.to_coordinates_image(AllenCCFv3Space())
+
+
+# ---------------------------------------------------------------------------
+# AnatomicalCoordinatesImage storage
+# ---------------------------------------------------------------------------
+
+
+def _write_read_coordinates_storage(tmp_path, coords):
+    nwbfile = mock_NWBFile()
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    nwbfile.create_processing_module("ophys", "ophys")
+    nwbfile.processing["ophys"].add(Images(name="SummaryImages", description="summary", images=[coords.image]))
+    localization.add_spaces([coords.space])
+    localization.add_anatomical_coordinates_images([coords])
+    with NWBHDF5IO(tmp_path / "test_storage.nwb", "w") as io:
+        io.write(nwbfile)
+    return NWBHDF5IO(tmp_path / "test_storage.nwb", "r", load_namespaces=True)
+
+
+def test_anatomical_coordinates_image_compressed_storage(tmp_path):
+    coords = _make_coordinates_image(shape=(300, 20))
+    expected = coords.get_coordinates()
+    coords = AnatomicalCoordinatesImage(
+        name="TestCoordinates",
+        image=coords.image,
+        method="test_method",
+        space=coords.space,
+        x=expected[..., 0],
+        y=expected[..., 1],
+        z=expected[..., 2],
+        storage={"compression": "gzip", "compression_opts": 4, "shuffle": True},
+    )
+
+    with _write_read_coordinates_storage(tmp_path, coords) as io:
+        read_coords = io.read().lab_meta_data["localization"].anatomical_coordinates_images["TestCoordinates"]
+        for dataset in (read_coords.x, read_coords.y, read_coords.z):
+            assert dataset.chunks == (256, 20)
+            assert dataset.compression == "gzip"
+            assert dataset.shuffle
+        npt.assert_array_equal(read_coords.get_coordinates(), expected)
+
+
+def test_anatomical_coordinates_image_chunked_pixels_write_read(tmp_path):
+    coords = _make_coordinates_image(shape=(300, 20))
+    expected = coords.get_coordinates()
+    coords = AnatomicalCoordinatesImage(
+        name="TestCoordinates",
+        image=coords.image,
+        method="test_method",
+        space=coords.space,
+        x=expected[..., 0],
+        y=expected[..., 1],
+        z=expected[..., 2],
+        storage={"chunks": (16, 8)},
+    )
+
+    # Pixels in bands of chunk rows that are consecutive, isolated, and out of order
+    i = np.array([299, 3, 17, 40, 3, 200, 31, 16])
+    j = np.array([19, 0, 5, 12, 7, 1, 2, 18])
+    with _write_read_coordinates_storage(tmp_path, coords) as io:
+        read_coords = io.read().lab_meta_data["localization"].anatomical_coordinates_images["TestCoordinates"]
+        npt.assert_array_equal(read_coords.get_coordinates(i=i, j=j), expected[i, j])
+
+
+def test_anatomical_coordinates_image_custom_storage(tmp_path):
+    shape = (6, 7)
+    x_data = np.arange(np.prod(shape), dtype=np.float32).reshape(shape)
+    coords = AnatomicalCoordinatesImage(
+        name="TestCoordinates",
+        image=GrayscaleImage(name="MeanImage", data=np.ones(shape), description="mean image"),
+        method="test_method",
+        space=Space(name="MySpace", space_name="MySpace", origin="bregma", units="um", orientation="RAS"),
+        x=x_data,
+        y=x_data,
+        z=H5DataIO(x_data, chunks=(2, 7)),
+        storage={"chunks": (3, 3), "compression": "gzip", "compression_opts": 9, "shuffle": False},
+    )
+
+    with _write_read_coordinates_storage(tmp_path, coords) as io:
+        read_coords = io.read().lab_meta_data["localization"].anatomical_coordinates_images["TestCoordinates"]
+        assert read_coords.x.chunks == (3, 3)
+        assert read_coords.x.compression_opts == 9
+        assert not read_coords.x.shuffle
+        # Data already wrapped in a DataIO keeps its own options
+        assert read_coords.z.chunks == (2, 7)
+        assert read_coords.z.compression is None
+
+
+@pytest.mark.parametrize("storage", [None, {}])
+def test_anatomical_coordinates_image_no_storage(storage):
+    shape = (6, 7)
+    coords = AnatomicalCoordinatesImage(
+        name="TestCoordinates",
+        image=GrayscaleImage(name="MeanImage", data=np.ones(shape), description="mean image"),
+        method="test_method",
+        space=Space(name="MySpace", space_name="MySpace", origin="bregma", units="um", orientation="RAS"),
+        x=np.ones(shape),
+        y=np.ones(shape),
+        z=np.ones(shape),
+        storage=storage,
+    )
+    assert isinstance(coords.x, np.ndarray)
+    npt.assert_array_equal(coords.x + 1, np.full(shape, 2.0))
+
+
+# ---------------------------------------------------------------------------
+# AnatomicalCoordinatesImage categorical brain regions
+# ---------------------------------------------------------------------------
+
+
+def _make_region_names(shape=(6, 7)):
+    names = np.full(shape, "VISp", dtype=object)
+    names[:, 4:] = "VISam"
+    names[0, 0] = "root"
+    return names
+
+
+def _make_region_coordinates_image(brain_region_encoding, storage=None):
+    shape = (6, 7)
+    return AnatomicalCoordinatesImage(
+        name="TestCoordinates",
+        image=GrayscaleImage(name="MeanImage", data=np.ones(shape), description="mean image"),
+        method="test_method",
+        space=Space(name="MySpace", space_name="MySpace", origin="bregma", units="um", orientation="RAS"),
+        x=np.ones(shape),
+        y=np.ones(shape),
+        z=np.ones(shape),
+        brain_region=_make_region_names(shape),
+        brain_region_encoding=brain_region_encoding,
+        storage=storage,
+    )
+
+
+@pytest.mark.parametrize("brain_region_encoding", ["text", "categorical"])
+def test_anatomical_coordinates_image_regions(brain_region_encoding):
+    coords = _make_region_coordinates_image(brain_region_encoding)
+    names = _make_region_names()
+
+    if brain_region_encoding == "categorical":
+        assert coords.brain_region is None
+        npt.assert_array_equal(coords.brain_region_names, ["VISam", "VISp", "root"])
+        assert coords.brain_region_index.dtype == np.int32
+    assert coords.get_region(0, 0) == "root"
+    assert coords.get_region(2, 5) == "VISam"
+    npt.assert_array_equal(coords.get_region([1, 2], [3, 4]), ["VISp", "VISam"])
+    npt.assert_array_equal(coords.get_region(), names)
+    npt.assert_array_equal(coords.region_mask("VISam"), names == "VISam")
+    assert not coords.region_mask("CA1").any()
+
+
+def test_anatomical_coordinates_image_categorical_regions_write_read(tmp_path):
+    coords = _make_region_coordinates_image("categorical", storage={"compression": "gzip"})
+    with _write_read_coordinates_storage(tmp_path, coords) as io:
+        read_coords = io.read().lab_meta_data["localization"].anatomical_coordinates_images["TestCoordinates"]
+        assert read_coords.brain_region is None
+        assert read_coords.brain_region_index.compression == "gzip"
+        assert read_coords.get_region(2, 5) == "VISam"
+        npt.assert_array_equal(read_coords.get_region(), _make_region_names())
+        npt.assert_array_equal(read_coords.region_mask("VISp"), _make_region_names() == "VISp")
+
+
+def test_anatomical_coordinates_image_regions_invalid():
+    shape = (2, 2)
+    kwargs = dict(
+        name="TestCoordinates",
+        image=GrayscaleImage(name="MeanImage", data=np.ones(shape), description="mean image"),
+        method="test_method",
+        space=Space(name="MySpace", space_name="MySpace", origin="bregma", units="um", orientation="RAS"),
+        x=np.ones(shape),
+        y=np.ones(shape),
+        z=np.ones(shape),
+    )
+    with pytest.raises(ValueError, match='"brain_region_encoding" must be "text" or "categorical"'):
+        AnatomicalCoordinatesImage(**kwargs, brain_region_encoding="enum")
+    with pytest.raises(ValueError, match='"brain_region_index" and "brain_region_names" must be provided together'):
+        AnatomicalCoordinatesImage(**kwargs, brain_region_index=np.zeros(shape, dtype=np.int32))
+    with pytest.raises(ValueError, match='"brain_region_index" must have the same shape as the image data'):
+        AnatomicalCoordinatesImage(**kwargs, brain_region_index=np.zeros((1, 2)), brain_region_names=["CA1"])
+    with pytest.raises(ValueError, match="has no brain region data"):
+        AnatomicalCoordinatesImage(**kwargs).get_region()
+
+
+# ---------------------------------------------------------------------------
+# Parametric AnatomicalCoordinatesImage
+# ---------------------------------------------------------------------------
+
+
+def _make_parametric_registration():
+    matrix = np.array([[0.99, -0.14, 50.0], [0.14, 0.99, 30.0], [0.0, 0.0, 1.0]])
+    return AtlasRegistration(
+        source_image=GrayscaleImage(name="SourceImage", data=np.ones((7, 9)), description="source FOV"),
+        affine_transformation=AffineTransformation(name="affine_transformation", affine_matrix=matrix),
+    )
+
+
+def test_parametric_anatomical_coordinates_image():
+    registration = _make_parametric_registration()
+    space = AllenCCFv3Space()
+    dense = registration.to_coordinates_image(space, z_plane=1500.0)
+    parametric = registration.to_coordinates_image(space, z_plane=1500.0, parametric=True)
+
+    assert parametric.x is None
+    assert parametric.pixel_to_space_matrix.shape == (3, 3)
+    expected = dense.get_coordinates()
+    npt.assert_array_almost_equal(parametric.get_coordinates(), expected, decimal=4)
+    npt.assert_array_almost_equal(parametric.get_coordinates(i=2, j=5), expected[2, 5], decimal=4)
+    npt.assert_array_almost_equal(
+        parametric.get_coordinates(rows=slice(1, 6, 2), cols=slice(3, None)), expected[1:6:2, 3:], decimal=4
+    )
+    i, j = np.array([0, 6, 3]), np.array([8, 0, -1])
+    npt.assert_array_almost_equal(parametric.get_coordinates(i=i, j=j), expected[i, j], decimal=4)
+    for rows, cols, tile in parametric.iter_tiles((4, 4)):
+        npt.assert_array_almost_equal(tile, expected[rows, cols], decimal=4)
+
+
+def test_parametric_anatomical_coordinates_image_write_read(tmp_path):
+    registration = _make_parametric_registration()
+    coords = registration.to_coordinates_image(AllenCCFv3Space(), name="TestCoordinates", parametric=True)
+    expected = coords.get_coordinates()
+
+    with _write_read_coordinates_storage(tmp_path, coords) as io:
+        read_coords = io.read().lab_meta_data["localization"].anatomical_coordinates_images["TestCoordinates"]
+        assert read_coords.x is None
+        npt.assert_array_almost_equal(read_coords.get_coordinates(), expected)
+        npt.assert_array_almost_equal(read_coords.get_coordinates(i=[1, 2], j=[3, 4]), expected[[1, 2], [3, 4]])
+
+
+def test_parametric_anatomical_coordinates_image_invalid():
+    shape = (2, 2)
+    kwargs = dict(
+        name="TestCoordinates",
+        image=GrayscaleImage(name="MeanImage", data=np.ones(shape), description="mean image"),
+        method="test_method",
+        space=Space(name="MySpace", space_name="MySpace", origin="bregma", units="um", orientation="RAS"),
+    )
+    with pytest.raises(ValueError, match='Either "x", "y", and "z" or "pixel_to_space_matrix" must be provided'):
+        AnatomicalCoordinatesImage(**kwargs, x=np.ones(shape))
+    with pytest.raises(ValueError, match='"pixel_to_space_matrix" cannot be provided together with "x", "y", and "z"'):
+        AnatomicalCoordinatesImage(**kwargs, x=np.ones(shape), pixel_to_space_matrix=np.eye(3))
+    with pytest.raises(ValueError, match=r'"pixel_to_space_matrix" must be a 3x3 array. Provided shape: \(4, 4\)'):
+        AnatomicalCoordinatesImage(**kwargs, pixel_to_space_matrix=np.eye(4))
+
+
+# ---------------------------------------------------------------------------
+# AnatomicalCoordinatesImage inverse lookup
+# ---------------------------------------------------------------------------
+
+
+def test_anatomical_coordinates_image_find_pixels():
+    registration = _make_parametric_registration()
+    coords = registration.to_coordinates_image(AllenCCFv3Space(), z_plane=100.0)
+    expected = coords.get_coordinates()
+
+    points = np.array([expected[2, 5], expected[6, 0] + [0.1, -0.1, 0.2], [1000.0, 1000.0, 1000.0]])
+    pixels, distances = coords.find_pixels(points)
+    npt.assert_array_equal(pixels[:2], [[2, 5], [6, 0]])
+    npt.assert_array_almost_equal(distances[:2], [0.0, np.sqrt(0.06)], decimal=4)
+
+    pixels, distances = coords.find_pixels(points, max_distance=1.0)
+    npt.assert_array_equal(pixels[2], [-1, -1])
+    assert distances[2] == np.inf
+
+    # Single point, and a subsampled index only returns pixels on the stride grid
+    pixel, distance = coords.find_pixels(expected[3, 3], stride=2)
+    assert pixel.shape == (2,)
+    assert np.all(pixel % 2 == 0)
+    assert distance == pytest.approx(np.linalg.norm(expected[tuple(pixel)] - expected[3, 3]), abs=1e-4)
+
+    # The index is cached per stride
+    index = coords._pixel_index
+    coords.find_pixels(points, stride=2)
+    assert coords._pixel_index is index
+
+    with pytest.raises(ValueError, match='"stride" must be positive'):
+        coords.find_pixels(points, stride=0)
+
+
+def test_anatomical_coordinates_image_find_pixels_nan_masked():
+    registration = _make_parametric_registration()
+    expected = registration.to_coordinates_image(AllenCCFv3Space(), z_plane=100.0).get_coordinates()
+    # Coordinate maps are NaN outside the registered brain
+    masked = expected.copy()
+    masked[:3] = np.nan
+    masked[5, 7] = [np.nan, 0.0, 0.0]
+    coords = AnatomicalCoordinatesImage(
+        name="TestCoordinates",
+        image=registration.source_image,
+        method="test_method",
+        space=AllenCCFv3Space(),
+        x=masked[..., 0],
+        y=masked[..., 1],
+        z=masked[..., 2],
+    )
+
+    pixels, distances = coords.find_pixels(np.array([expected[4, 6], expected[6, 8], expected[5, 7]]))
+    npt.assert_array_equal(pixels[:2], [[4, 6], [6, 8]])
+    npt.assert_array_almost_equal(distances[:2], [0.0, 0.0])
+    # A masked pixel is never returned
+    assert tuple(pixels[2]) != (5, 7)
+    assert np.isfinite(distances[2])
+
+    pixels, distances = coords.find_pixels(expected[1, 1], max_distance=0.5)
+    npt.assert_array_equal(pixels, [-1, -1])
+    assert distances == np.inf
+
+
+# ---------------------------------------------------------------------------
+# AnatomicalCoordinatesTable bulk append
+# ---------------------------------------------------------------------------
+
+
+def test_anatomical_coordinates_table_add_rows():
+    nwbfile = mock_NWBFile()
+    electrodes_table = mock_ElectrodeTable(nwbfile=nwbfile)
+    table = AnatomicalCoordinatesTable(
+        name="MyAnatomicalLocalization",
+        target=electrodes_table,
+        description="Anatomical coordinates table",
+        method="method",
+        space=AllenCCFv3Space(),
+    )
+    table.add_rows(
+        x=np.array([1.0, 2.0, 3.0]),
+        y=np.zeros(3),
+        z=np.ones(3),
+        localized_entity=np.array([2, 1, 0]),
+        brain_region=["CA1", "CA3", "DG"],
+    )
+    table.add_row(x=4.0, y=0.0, z=1.0, localized_entity=3, brain_region="CA1")
+    table.add_rows(x=[5.0], y=[0.0], z=[1.0], localized_entity=[4], brain_region=["CA2"])
+
+    assert len(table) == 5
+    npt.assert_array_equal(table.id.data, np.arange(5))
+    npt.assert_array_equal(table["x"].data, [1.0, 2.0, 3.0, 4.0, 5.0])
+    npt.assert_array_equal(table["localized_entity"].data, [2, 1, 0, 3, 4])
+    assert table["brain_region"].data == ["CA1", "CA3", "DG", "CA1", "CA2"]
+    assert table["localized_entity"][0].index[0] == 2
+
+    with pytest.raises(ValueError, match="All columns must be 1D arrays of length 2"):
+        table.add_rows(x=[1.0, 2.0], y=[1.0], z=[1.0, 2.0], localized_entity=[0, 1], brain_region=["a", "b"])
+    with pytest.raises(ValueError, match=r"Values must match the table columns. Missing: \['brain_region'\]"):
+        table.add_rows(x=[1.0], y=[1.0], z=[1.0], localized_entity=[0])
+    with pytest.raises(ValueError, match='"localized_entity" must contain integer row indices'):
+        table.add_rows(x=[1.0], y=[1.0], z=[1.0], localized_entity=[0.5], brain_region=["a"])
+    assert len(table) == 5
+
+
+def test_anatomical_coordinates_table_from_arrays_write_read(tmp_path):
+    nwbfile = mock_NWBFile()
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    electrodes_table = mock_ElectrodeTable(nwbfile=nwbfile)
+    space = AllenCCFv3Space()
+    localization.add_spaces([space])
+
+    n_rows = len(electrodes_table)
+    table = AnatomicalCoordinatesTable.from_arrays(
+        name="MyAnatomicalLocalization",
+        description="Anatomical coordinates table",
+        space=space,
+        method="method",
+        target=electrodes_table,
+        x=np.arange(n_rows, dtype=float),
+        y=np.arange(n_rows, dtype=float) * 2,
+        z=np.arange(n_rows, dtype=float) * 3,
+        confidence=np.linspace(0, 1, n_rows),
+    )
+    assert all(isinstance(column.data, np.ndarray) for column in table.columns)
+    localization.add_anatomical_coordinates_tables([table])
+
+    with NWBHDF5IO(tmp_path / "test_from_arrays.nwb", "w") as io:
+        io.write(nwbfile)
+
+    with NWBHDF5IO(tmp_path / "test_from_arrays.nwb", "r", load_namespaces=True) as io:
+        read_nwbfile = io.read()
+        read_table = read_nwbfile.lab_meta_data["localization"].anatomical_coordinates_tables[
+            "MyAnatomicalLocalization"
+        ]
+        assert len(read_table) == n_rows
+        npt.assert_array_equal(read_table["z"].data[:], np.arange(n_rows) * 3.0)
+        npt.assert_array_equal(read_table["localized_entity"].data[:], np.arange(n_rows))
+        npt.assert_array_almost_equal(read_table["confidence"].data[:], np.linspace(0, 1, n_rows))
+        assert read_table["localized_entity"].table is read_nwbfile.electrodes
+
+
+# ---------------------------------------------------------------------------
+# AnatomicalCoordinatesTable DataFrame/Arrow export
+# ---------------------------------------------------------------------------
+
+
+def _make_joined_table():
+    coords = np.arange(15, dtype=float).reshape(5, 3)
+    table = _make_coordinates_table(coords)
+    table.add_column(name="confidence", description="confidence", data=[0.1, 0.2, 0.3, 0.4, 0.5])
+    return table
+
+
+def test_anatomical_coordinates_table_to_joined_dataframe():
+    table = _make_joined_table()
+    electrodes_table = table["localized_entity"].table
+
+    df = table.to_joined_dataframe()
+    assert df.index.name == "id"
+    assert list(df.columns) == [
+        "x",
+        "y",
+        "z",
+        "localized_entity",
+        "confidence",
+        "electrodes_id",
+        "electrodes_location",
+        "electrodes_group",
+        "electrodes_group_name",
+    ]
+    npt.assert_array_equal(df["x"], [0.0, 3.0, 6.0, 9.0, 12.0])
+    npt.assert_array_equal(df["localized_entity"], [4, 3, 2, 1, 0])
+    npt.assert_array_equal(df["electrodes_id"], [4, 3, 2, 1, 0])
+    assert list(df["electrodes_group"]) == [electrodes_table["group"][i] for i in [4, 3, 2, 1, 0]]
+
+    df = table.to_joined_dataframe(columns=["z"], target_columns=["location"], target_prefix="electrode.")
+    assert list(df.columns) == ["z", "electrode.id", "electrode.location"]
+
+    with pytest.raises(ValueError, match=r"Columns not in MyAnatomicalLocalization: \['w'\]"):
+        table.to_joined_dataframe(columns=["w"])
+    with pytest.raises(ValueError, match=r"Columns not in electrodes: \['w'\]"):
+        table.to_joined_dataframe(target_columns=["w"])
+
+
+def test_anatomical_coordinates_table_to_dataframe_inherited():
+    table = _make_joined_table()
+
+    # The DynamicTable.to_dataframe signature and nested target rows are unchanged
+    df = table.to_dataframe()
+    assert list(df.columns) == ["x", "y", "z", "localized_entity", "confidence"]
+    assert isinstance(df["localized_entity"].iloc[0], pd.DataFrame)
+    df = table.to_dataframe(index=True)
+    npt.assert_array_equal(df["localized_entity"], [4, 3, 2, 1, 0])
+    df = table.to_dataframe(exclude={"x"})
+    assert "x" not in df.columns
+    assert table == table
+
+
+def test_anatomical_coordinates_table_to_joined_dataframe_write_read(tmp_path):
+    table = _make_joined_table()
+    nwbfile = table["localized_entity"].table.get_ancestor("NWBFile")
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    localization.add_spaces([table.space])
+    localization.add_anatomical_coordinates_tables([table])
+    expected = table.to_joined_dataframe(target_columns=["location", "group_name"])
+
+    with NWBHDF5IO(tmp_path / "test_to_joined_dataframe.nwb", "w") as io:
+        io.write(nwbfile)
+
+    with NWBHDF5IO(tmp_path / "test_to_joined_dataframe.nwb", "r", load_namespaces=True) as io:
+        read_nwbfile = io.read()
+        localization = read_nwbfile.lab_meta_data["localization"]
+        read_table = localization.anatomical_coordinates_tables["MyAnatomicalLocalization"]
+        df = read_table.to_joined_dataframe(target_columns=["location", "group_name"])
+        assert df.equals(expected)
+
+
+def test_anatomical_coordinates_table_to_arrow():
+    pa = pytest.importorskip("pyarrow")
+    table = _make_joined_table()
+
+    arrow_table = table.to_arrow(target_columns=["location"])
+    assert isinstance(arrow_table, pa.Table)
+    assert arrow_table.column_names == [
+        "id",
+        "x",
+        "y",
+        "z",
+        "localized_entity",
+        "confidence",
+        "electrodes_id",
+        "electrodes_location",
+    ]
+    npt.assert_array_equal(arrow_table["electrodes_id"].to_numpy(), [4, 3, 2, 1, 0])
+
+
+def test_anatomical_coordinates_table_to_arrow_electrode_groups(tmp_path):
+    pytest.importorskip("pyarrow")
+    table = _make_joined_table()
+    electrodes_table = table["localized_entity"].table
+    group_names = [electrodes_table["group"][i].name for i in [4, 3, 2, 1, 0]]
+
+    # The electrode groups are ElectrodeGroup objects, which are stored by name
+    arrow_table = table.to_arrow()
+    assert arrow_table["electrodes_group"].to_pylist() == group_names
+
+    nwbfile = electrodes_table.get_ancestor("NWBFile")
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    localization.add_spaces([table.space])
+    localization.add_anatomical_coordinates_tables([table])
+    with NWBHDF5IO(tmp_path / "test_to_arrow.nwb", "w") as io:
+        io.write(nwbfile)
+
+    with NWBHDF5IO(tmp_path / "test_to_arrow.nwb", "r", load_namespaces=True) as io:
+        localization = io.read().lab_meta_data["localization"]
+        read_table = localization.anatomical_coordinates_tables["MyAnatomicalLocalization"]
+        assert read_table.to_arrow().equals(arrow_table)
+
+
+# ---------------------------------------------------------------------------
+# Cross-session catalog
+# ---------------------------------------------------------------------------
+
+
+def _write_catalog_session(path, space, coords, brain_regions):
+    nwbfile = mock_NWBFile()
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    electrodes_table = mock_ElectrodeTable(nwbfile=nwbfile, n_rows=len(coords))
+    localization.add_spaces([space])
+    table = AnatomicalCoordinatesTable.from_arrays(
+        name="MyAnatomicalLocalization",
+        description="Anatomical coordinates table",
+        space=space,
+        method="method",
+        target=electrodes_table,
+        x=coords[:, 0],
+        y=coords[:, 1],
+        z=coords[:, 2],
+        brain_region=brain_regions,
+    )
+    localization.add_anatomical_coordinates_tables([table])
+    with NWBHDF5IO(path, "w") as io:
+        io.write(nwbfile)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("suffix", [".npz", ".parquet"])
+def test_build_catalog(tmp_path, workers, suffix):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    ccf_coords = np.array([[100.0, 200.0, 300.0], [400.0, 500.0, 600.0], [700.0, 800.0, 900.0]])
+    _write_catalog_session(tmp_path / "ccf.nwb", AllenCCFv3Space(), ccf_coords, ["VISp", "CA1", "VISp"])
+    ras_space = Space(name="MySpace", space_name="MySpace", origin="bregma", units="mm", orientation="RAS")
+    ras_coords = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+    _write_catalog_session(tmp_path / "ras.nwb", ras_space, ras_coords, ["CA1", "VISp"])
+
+    paths = [tmp_path / "ccf.nwb", tmp_path / "ras.nwb"]
+    catalog_path = tmp_path / f"catalog{suffix}"
+    catalog = build_catalog(paths, AllenCCFv3Space, catalog_path, workers=workers)
+    assert list(catalog["brain_region"]) == ["CA1", "CA1", "VISp", "VISp", "VISp"]
+    assert list(catalog["source_space"]) == ["AllenCCFv3", "MySpace", "AllenCCFv3", "AllenCCFv3", "MySpace"]
+    npt.assert_array_equal(catalog["row"], [1, 0, 0, 2, 1])
+    assert set(catalog["target"]) == {"/general/extracellular_ephys/electrodes"}
+
+    visp = read_catalog(catalog_path, brain_region="VISp")
+    assert visp["space"] == "AllenCCFv3"
+    assert list(visp["path"]) == [str(paths[0]), str(paths[0]), str(paths[1])]
+    npt.assert_array_equal(visp["localized_entity"], [0, 2, 1])
+    expected = ras_space.transform_to(AllenCCFv3Space(), ras_coords[1])
+    npt.assert_array_almost_equal(
+        np.column_stack([visp["x"], visp["y"], visp["z"]]), np.vstack([ccf_coords[0], ccf_coords[2], expected])
+    )
+
+    ras_ca1 = read_catalog(catalog_path, brain_region="CA1", source_space="MySpace")
+    npt.assert_array_equal(ras_ca1["row"], [0])
+    assert len(read_catalog(catalog_path, brain_region="DG")["row"]) == 0
+
+    with pytest.raises(ValueError, match="output_path must end in '.npz' or '.parquet'"):
+        build_catalog(paths, AllenCCFv3Space, tmp_path / "catalog.csv")
+
+
+def test_read_catalog_reads_selected_rows(tmp_path):
+    from ndx_anatomical_localization.catalog import _open_npz_column
+
+    coords = np.arange(12, dtype=float).reshape(4, 3)
+    _write_catalog_session(tmp_path / "session.nwb", AllenCCFv3Space(), coords, ["VISp", "CA1", "VISp", "DG"])
+    catalog = build_catalog([tmp_path / "session.nwb"], AllenCCFv3Space, tmp_path / "catalog.npz", workers=1)
+
+    # The columns of a .npz catalog are memory-mapped, so only the rows of the selected regions are read
+    with zipfile.ZipFile(tmp_path / "catalog.npz") as npz:
+        x = _open_npz_column(str(tmp_path / "catalog.npz"), npz, "x")
+    assert isinstance(x, np.memmap)
+    npt.assert_array_equal(x, catalog["x"])
+    npt.assert_array_equal(read_catalog(tmp_path / "catalog.npz", brain_region="VISp")["x"], [0.0, 6.0])
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    build_catalog([tmp_path / "session.nwb"], AllenCCFv3Space, tmp_path / "catalog.parquet", workers=1)
+    # One row group per (brain region, source space) pair
+    assert pq.ParquetFile(tmp_path / "catalog.parquet").num_row_groups == 3
+    npt.assert_array_equal(read_catalog(tmp_path / "catalog.parquet", brain_region="VISp")["x"], [0.0, 6.0])
+
+
+def test_read_localization_summary(tmp_path):
+    coords = _make_coordinates_image(shape=(6, 7))
+    nwbfile = mock_NWBFile()
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    nwbfile.create_processing_module("ophys", "ophys")
+    nwbfile.processing["ophys"].add(Images(name="SummaryImages", description="summary", images=[coords.image]))
+    ccf_space = AllenCCFv3Space()
+    localization.add_spaces([ccf_space, coords.space])
+    localization.add_anatomical_coordinates_images([coords])
+    localization.add_brain_region_masks([_make_region_masks()])
+    electrodes_table = mock_ElectrodeTable(nwbfile=nwbfile, n_rows=4)
+    table = AnatomicalCoordinatesTable.from_arrays(
+        name="MyAnatomicalLocalization",
+        description="Anatomical coordinates table",
+        space=ccf_space,
+        method="method",
+        target=electrodes_table,
+        x=np.zeros(4),
+        y=np.zeros(4),
+        z=np.zeros(4),
+    )
+    localization.add_anatomical_coordinates_tables([table])
+    with NWBHDF5IO(tmp_path / "test_summary.nwb", "w") as io:
+        io.write(nwbfile)
+
+    summary = read_localization_summary(tmp_path / "test_summary.nwb")
+    assert sorted(summary["spaces"], key=lambda space: space["name"]) == [
+        {
+            "name": "AllenCCFv3",
+            "neurodata_type": "AllenCCFv3Space",
+            "space_name": "AllenCCFv3",
+            "origin": ccf_space.origin,
+            "units": "um",
+            "orientation": "PIR",
+        },
+        {
+            "name": "MySpace",
+            "neurodata_type": "Space",
+            "space_name": "MySpace",
+            "origin": "bregma",
+            "units": "um",
+            "orientation": "RAS",
+        },
+    ]
+    assert summary["anatomical_coordinates_tables"] == [
+        {
+            "name": "MyAnatomicalLocalization",
+            "neurodata_type": "AnatomicalCoordinatesTable",
+            "description": "Anatomical coordinates table",
+            "method": "method",
+            "space": "AllenCCFv3",
+            "target": "/general/extracellular_ephys/electrodes",
+            "n_rows": 4,
+        }
+    ]
+    assert summary["anatomical_coordinates_images"] == [
+        {
+            "name": "TestCoordinates",
+            "neurodata_type": "AnatomicalCoordinatesImage",
+            "description": coords.description,
+            "method": "test_method",
+            "space": "MySpace",
+            "image": "MeanImage",
+            "shape": (6, 7),
+        }
+    ]
+    assert summary["brain_region_masks"] == [
+        {"name": "masks", "neurodata_type": "BrainRegionMasks", "description": "pixel masks", "n_rows": 5}
+    ]
+
+    with NWBHDF5IO(tmp_path / "test_empty.nwb", "w") as io:
+        io.write(mock_NWBFile())
+    assert read_localization_summary(tmp_path / "test_empty.nwb") == {
+        "spaces": [],
+        "anatomical_coordinates_tables": [],
+        "anatomical_coordinates_images": [],
+        "brain_region_masks": [],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Cached spec
+# ---------------------------------------------------------------------------
+
+
+def test_cached_spec_reader(tmp_path, monkeypatch):
+    from hdmf.spec.namespace import YAMLSpecReader
+
+    from ndx_anatomical_localization._spec_cache import CachedYAMLSpecReader
+
+    spec_dir = tmp_path / "spec"
+    spec_dir.mkdir()
+    (spec_dir / "test.namespace.yaml").write_text("namespaces:\n- name: test\n  version: 0.1.0\n")
+    (spec_dir / "test.extensions.yaml").write_text("groups:\n- neurodata_type_def: Test\n  shape: [3, null]\n")
+    reader = CachedYAMLSpecReader(indir=str(spec_dir), cache_directory=tmp_path / "cache")
+
+    namespaces = reader.read_namespace(str(spec_dir / "test.namespace.yaml"))
+    spec = reader.read_spec("test.extensions.yaml")
+    assert namespaces == [{"name": "test", "version": "0.1.0"}]
+    assert spec == {"groups": [{"neurodata_type_def": "Test", "shape": [3, None]}]}
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 2
+
+    # Unchanged files are read from the cache without parsing the YAML
+    def fail(*args):
+        raise AssertionError("YAML was parsed")
+
+    monkeypatch.setattr(YAMLSpecReader, "read_namespace", fail)
+    monkeypatch.setattr(YAMLSpecReader, "read_spec", fail)
+    assert reader.read_namespace(str(spec_dir / "test.namespace.yaml")) == namespaces
+    assert reader.read_spec("test.extensions.yaml") == spec
+
+    # Edited files are parsed again
+    monkeypatch.undo()
+    (spec_dir / "test.extensions.yaml").write_text("groups:\n- neurodata_type_def: Edited\n")
+    assert reader.read_spec("test.extensions.yaml") == {"groups": [{"neurodata_type_def": "Edited"}]}
+
+    # A cache directory that cannot be written falls back to parsing the YAML
+    (tmp_path / "not_a_directory").write_text("")
+    reader = CachedYAMLSpecReader(indir=str(spec_dir), cache_directory=tmp_path / "not_a_directory" / "cache")
+    assert reader.read_spec("test.extensions.yaml") == {"groups": [{"neurodata_type_def": "Edited"}]}
+
+
+# ---------------------------------------------------------------------------
+# Space orientation validation
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("orientation", ["RA", "RASP", "RAX", "RAR", "APS", "ras", ""])
+def test_space_invalid_orientation(orientation):
+    with pytest.raises(ValueError, match="orientation must be a string of 3 letters"):
+        Space(name="MySpace", space_name="MySpace", origin="bregma", units="um", orientation=orientation)
+
+
+def test_space_axis_matrix():
+    ras_space = Space(name="MySpace", space_name="MySpace", origin="bregma", units="um", orientation="RAS")
+    npt.assert_array_equal(ras_space.axis_matrix, np.eye(3))
+    assert not ras_space.axis_matrix.flags.writeable
+
+    # PIR: positive x is posterior, positive y is inferior, positive z is right
+    ccf_space = AllenCCFv3Space()
+    npt.assert_array_equal(ccf_space.axis_matrix, [[0, 0, 1], [-1, 0, 0], [0, -1, 0]])
+    assert ccf_space.axis_matrix is AllenCCFv3Space().axis_matrix
+
+    point = np.array([100.0, 200.0, 300.0])
+    npt.assert_array_almost_equal(ccf_space.transform_to(ras_space, point), ccf_space.axis_matrix @ point)
+
+
+def test_space_all_orientations():
+    letters = ["".join(code) for code in itertools.product("APLRSI", repeat=3)]
+    dimensions = {"A": 0, "P": 0, "L": 1, "R": 1, "S": 2, "I": 2}
+    valid = [code for code in letters if len({dimensions[letter] for letter in code}) == 3]
+    assert len(valid) == 48
+
+    ras_space = Space(name="RAS", space_name="RAS", origin="bregma", units="um", orientation="RAS")
+    for code in valid:
+        space = Space(name=code, space_name=code, origin="bregma", units="mm", orientation=code)
+        matrix = space.get_transform_matrix(ras_space)
+        npt.assert_array_almost_equal(matrix[:3, :3], space.axis_matrix * 1000.0)
+        npt.assert_array_almost_equal(
+            ras_space.transform_to(space, space.transform_to(ras_space, [1.0, 2.0, 3.0])), [1, 2, 3]
+        )
+
+
+# ---------------------------------------------------------------------------
+# Canonical spaces and space deduplication
+# ---------------------------------------------------------------------------
+
+
+def test_canonical_space_get():
+    nwbfile = mock_NWBFile()
+    space = AllenCCFv3Space.get(nwbfile)
+    localization = nwbfile.lab_meta_data["localization"]
+    assert isinstance(localization, Localization)
+    assert localization.spaces["AllenCCFv3"] is space
+
+    assert AllenCCFv3Space.get(nwbfile) is space
+    d99_space = D99v2Space.get(nwbfile)
+    assert isinstance(d99_space, D99v2Space)
+    assert D99v2Space.get(nwbfile) is d99_space
+    assert set(localization.spaces) == {"AllenCCFv3", "D99v2"}
+
+    with pytest.raises(TypeError, match="Space.get is only available for canonical spaces"):
+        Space.get(nwbfile)
+
+
+def test_localization_deduplicate_spaces(tmp_path):
+    nwbfile = mock_NWBFile()
+    localization = Localization()
+    nwbfile.add_lab_meta_data([localization])
+    electrodes_table = mock_ElectrodeTable(nwbfile=nwbfile)
+    spaces = [
+        AllenCCFv3Space(name="ccf_probe0"),
+        AllenCCFv3Space(name="ccf_probe1"),
+        Space(name="bregma_probe0", space_name="Bregma", origin="bregma", units="um", orientation="RAS"),
+        Space(name="bregma_probe1", space_name="Bregma", origin="bregma", units="um", orientation="RAS"),
+        Space(name="bregma_mm", space_name="Bregma", origin="bregma", units="mm", orientation="RAS"),
+    ]
+    localization.add_spaces(spaces)
+    for space in spaces:
+        localization.add_anatomical_coordinates_tables(
+            [
+                AnatomicalCoordinatesTable.from_arrays(
+                    name=f"table_{space.name}",
+                    description="Anatomical coordinates table",
+                    space=space,
+                    method="method",
+                    target=electrodes_table,
+                    x=np.zeros(5),
+                    y=np.zeros(5),
+                    z=np.zeros(5),
+                )
+            ]
+        )
+
+    replacements = localization.deduplicate_spaces()
+    assert replacements == {"ccf_probe1": "ccf_probe0", "bregma_probe1": "bregma_probe0"}
+    assert set(localization.spaces) == {"ccf_probe0", "bregma_probe0", "bregma_mm"}
+    tables = localization.anatomical_coordinates_tables
+    assert tables["table_ccf_probe1"].space is localization.spaces["ccf_probe0"]
+    assert tables["table_bregma_probe1"].space is localization.spaces["bregma_probe0"]
+    assert tables["table_bregma_mm"].space is localization.spaces["bregma_mm"]
+    assert localization.deduplicate_spaces() == {}
+
+    with NWBHDF5IO(tmp_path / "test_deduplicate.nwb", "w") as io:
+        io.write(nwbfile)
+
+    with NWBHDF5IO(tmp_path / "test_deduplicate.nwb", "r", load_namespaces=True) as io:
+        read_localization = io.read().lab_meta_data["localization"]
+        assert set(read_localization.spaces) == {"ccf_probe0", "bregma_probe0", "bregma_mm"}
+        read_tables = read_localization.anatomical_coordinates_tables
+        assert read_tables["table_ccf_probe1"].space is read_localization.spaces["ccf_probe0"]
+        assert AllenCCFv3Space.get(io.read()) is read_localization.spaces["ccf_probe0"]
+
+
+# ---------------------------------------------------------------------------
+# Streamed AnatomicalCoordinatesImage
+# ---------------------------------------------------------------------------
+
+
+class _ArrayChunkIterator(GenericDataChunkIterator):
+    def __init__(self, array, **kwargs):
+        self._array = array
+        super().__init__(**kwargs)
+
+    def _get_data(self, selection):
+        return self._array[selection]
+
+    def _get_maxshape(self):
+        return self._array.shape
+
+    def _get_dtype(self):
+        return self._array.dtype
+
+
+def test_streamed_anatomical_coordinates_image_write_read(tmp_path):
+    shape = (300, 20)
+    rows, cols = np.mgrid[: shape[0], : shape[1]].astype(np.float32)
+    index = (cols >= 10).astype(np.int32)
+    coords = AnatomicalCoordinatesImage(
+        name="TestCoordinates",
+        image=GrayscaleImage(name="MeanImage", data=np.ones(shape), description="mean image"),
+        method="test_method",
+        space=Space(name="MySpace", space_name="MySpace", origin="bregma", units="um", orientation="RAS"),
+        x=_ArrayChunkIterator(rows, chunk_shape=(100, 20), buffer_shape=(200, 20)),
+        y=DataChunkIterator(data=iter(cols), maxshape=shape, dtype=np.dtype(np.float32)),
+        z=DataChunkIterator(data=iter(rows + cols)),
+        brain_region_index=DataChunkIterator(data=iter(index), maxshape=shape, dtype=np.dtype(np.int32)),
+        brain_region_names=np.array(["VISp", "VISam"]),
+        storage={"compression": "gzip"},
+    )
+
+    with _write_read_coordinates_storage(tmp_path, coords) as io:
+        read_coords = io.read().lab_meta_data["localization"].anatomical_coordinates_images["TestCoordinates"]
+        assert read_coords.x.chunks == (100, 20)
+        assert read_coords.x.compression == "gzip"
+        npt.assert_array_equal(read_coords.get_coordinates(), np.stack([rows, cols, rows + cols], axis=-1))
+        npt.assert_array_equal(read_coords.get_region(), np.where(cols < 10, "VISp", "VISam"))
+
+
+def test_streamed_anatomical_coordinates_image_invalid():
+    shape = (6, 7)
+    kwargs = dict(
+        name="TestCoordinates",
+        image=GrayscaleImage(name="MeanImage", data=np.ones(shape), description="mean image"),
+        method="test_method",
+        space=Space(name="MySpace", space_name="MySpace", origin="bregma", units="um", orientation="RAS"),
+        y=np.ones(shape),
+        z=np.ones(shape),
+    )
+    with pytest.raises(ValueError, match=r"x.shape: \(6, 8\)"):
+        AnatomicalCoordinatesImage(**kwargs, x=_ArrayChunkIterator(np.ones((6, 8))))
+    with pytest.raises(ValueError, match=r"x.shape: \(None, 8\)"):
+        AnatomicalCoordinatesImage(**kwargs, x=DataChunkIterator(data=iter(np.ones((6, 8)))))
+    with pytest.raises(ValueError, match='"brain_region" must have the same shape as the image data'):
+        AnatomicalCoordinatesImage(**kwargs, x=np.ones(shape), brain_region=_make_region_names((6, 8)))
+    with pytest.raises(ValueError, match='"brain_region" cannot be a data chunk iterator'):
+        AnatomicalCoordinatesImage(
+            **kwargs, x=np.ones(shape), brain_region=DataChunkIterator(data=iter(_make_region_names(shape)))
+        )
+
+
+def test_streamed_to_coordinates_image(tmp_path):
+    registration = _make_parametric_registration()
+    expected = registration.to_coordinates_image(AllenCCFv3Space(), z_plane=1500.0).get_coordinates()
+    with pytest.raises(ValueError, match='"parametric" and "stream" cannot both be True'):
+        registration.to_coordinates_image(AllenCCFv3Space(), parametric=True, stream=True)
+
+    coords = registration.to_coordinates_image(
+        AllenCCFv3Space(),
+        name="TestCoordinates",
+        z_plane=1500.0,
+        block_rows=3,
+        stream=True,
+        storage={"compression": "gzip"},
+    )
+    assert coords.x.data.buffer_shape == (7, 9)
+    with _write_read_coordinates_storage(tmp_path, coords) as io:
+        read_coords = io.read().lab_meta_data["localization"].anatomical_coordinates_images["TestCoordinates"]
+        assert read_coords.x.dtype == np.float32
+        assert read_coords.x.chunks == (7, 9)
+        assert read_coords.x.compression == "gzip"
+        npt.assert_array_almost_equal(read_coords.get_coordinates(), expected, decimal=4)